@@ -2,11 +2,12 @@ from typing import Annotated, Any, Literal
 from uuid import UUID
 
 import jwt
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
 from pydantic import ValidationError
 
+from libs.auth_lib.core.cache import token_cache
 from libs.auth_lib.core.security import (
     security_settings as auth_lib_security_settings,
 )
@@ -30,11 +31,13 @@ async def get_token_data(
     token: str, required_type: Literal["access", "refresh"]
 ) -> TokenData:
     """
-    Validates an access token and optionally checks if it's blacklisted.
+    Validates an access token and checks it against the revocation hooks.
+
+    Verified tokens are cached until they expire, so reused tokens skip decoding.
 
     Args:
         token (str): The JWT access token.
-        blacklist_check (callable, optional): Function to check if the token is blacklisted.
+        required_type (str): The expected token type, "access" or "refresh".
 
     Returns:
         UUID: The user ID extracted from the token.
@@ -42,45 +45,89 @@ async def get_token_data(
     Raises:
         HTTPException: If the token is invalid, blacklisted, or malformed.
     """
-    try:
-        payload = jwt.decode(
-            token,
-            settings.SECRET_KEY,
-            algorithms=[auth_lib_security_settings.ALGORITHM],
-        )
-        user_id: UUID = payload.get("user_id")
-        role: str = payload.get("role")
-        verified: bool = payload.get("verified")
-        type: str = payload.get("type")
+    cached = token_cache.get(token)
+    if cached is None:
+        try:
+            payload = jwt.decode(
+                token,
+                settings.SECRET_KEY,
+                algorithms=[auth_lib_security_settings.ALGORITHM],
+            )
+            user_id: UUID = payload.get("user_id")
+            role: str = payload.get("role")
+            verified: bool = payload.get("verified")
+            type: str = payload.get("type")
 
-        if not user_id:
-            raise credential_exception
+            if not user_id:
+                raise credential_exception
 
-        if type != required_type:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token type",
+            token_data = TokenData(
+                user_id=user_id, role=role, verified=verified, type=type
             )
 
-        token_data = TokenData(user_id=user_id, role=role, verified=verified, type=type)
+        except (InvalidTokenError, ValidationError):
+            raise credential_exception
 
-        return token_data
+        token_cache.set(token, payload, token_data)
+    else:
+        payload, token_data = cached
 
-    except (InvalidTokenError, ValidationError):
+    if await token_cache.is_revoked(payload):
+        token_cache.invalidate(token)
         raise credential_exception
 
+    if token_data.type != required_type:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token type",
+        )
+
+    return token_data
+
+
+async def get_request_token_data(request: Request, token: str) -> TokenData:
+    """
+    Validates the access token of a request, decoding it at most once per request.
+
+    The outcome is stored in request.state so the limiter, the auth dependencies and any
+    middleware reading scope["state"] share the same decoded token.
+
+    Args:
+        request (Request): The incoming HTTP request.
+        token (str): The JWT access token sent with the request.
+
+    Returns:
+        TokenData: The decoded token data.
+
+    Raises:
+        HTTPException: If the token is invalid or malformed.
+    """
+    cached = getattr(request.state, "access_token_data", None)
+    if cached is None or cached[0] != token:
+        result: TokenData | HTTPException
+        try:
+            result = await get_token_data(token=token, required_type="access")
+        except HTTPException as e:
+            result = e
+        cached = request.state.access_token_data = (token, result)
+
+    if isinstance(cached[1], HTTPException):
+        raise cached[1]
+    return cached[1]
+
 
-async def get_current_token_data(token: token_dep) -> TokenData:
+async def get_current_token_data(request: Request, token: token_dep) -> TokenData:
     """
     Get the current user ID from the token.
 
     Args:
+        request (Request): The incoming HTTP request.
         token (str): The token to decode.
 
     Returns:
         UUID: The user ID.
     """
-    return await get_token_data(token=token, required_type="access")
+    return await get_request_token_data(request, token)
 
 
 # Dependency to get the token data
@@ -0,0 +1,301 @@
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import Any, ClassVar
+from uuid import UUID
+
+from prometheus_client import Counter
+from pydantic_settings import BaseSettings
+
+from libs.auth_lib.core.security import security_settings
+from libs.auth_lib.schemas import TokenData
+from libs.utils_lib.core.redis import redis_client
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Receives the claims of a valid token and returns True if it has been revoked
+RevocationHook = Callable[[dict[str, Any]], Awaitable[bool]]
+
+
+class Metrics(BaseSettings):
+    TOKEN_CACHE_LOOKUPS_TOTAL: ClassVar[Counter] = Counter(
+        "auth_token_cache_lookups_total",
+        "Total number of verified token cache lookups.",
+        ["result"],
+    )
+    TOKEN_CACHE_EVICTIONS_TOTAL: ClassVar[Counter] = Counter(
+        "auth_token_cache_evictions_total",
+        "Total number of verified tokens removed from the cache.",
+        ["reason"],
+    )
+
+
+metrics = Metrics()
+
+
+class TokenCache:
+    """
+    A bounded LRU cache of verified JWTs, keyed by the SHA-256 of the token.
+
+    Entries are kept until the token's exp claim, so a client reusing its token skips the
+    signature check and TokenData validation. Revocation hooks are consulted for cached
+    and freshly decoded tokens alike.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        """
+        Initialize the token cache.
+
+        Args:
+            max_size (int): The maximum number of tokens to cache, 0 disables caching.
+        """
+        self.max_size = max_size
+        self.entries: OrderedDict[str, tuple[float, dict[str, Any], TokenData]] = (
+            OrderedDict()
+        )
+        self.revocation_hooks: list[RevocationHook] = []
+
+    @staticmethod
+    def get_key(token: str) -> str:
+        """
+        Get the cache key of a token, so raw tokens are never held in memory.
+
+        Args:
+            token (str): The JWT.
+        Returns:
+            str: The hex SHA-256 digest of the token.
+        """
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> tuple[dict[str, Any], TokenData] | None:
+        """
+        Get the verified claims and token data of a token.
+
+        Args:
+            token (str): The JWT.
+        Returns:
+            tuple[dict, TokenData] | None: The cached claims and token data, or None on a miss.
+        """
+        key = self.get_key(token)
+        entry = self.entries.get(key)
+        if entry is None:
+            metrics.TOKEN_CACHE_LOOKUPS_TOTAL.labels(result="miss").inc()
+            return None
+
+        expires_at, claims, token_data = entry
+        if expires_at <= time.time():
+            del self.entries[key]
+            metrics.TOKEN_CACHE_EVICTIONS_TOTAL.labels(reason="expired").inc()
+            metrics.TOKEN_CACHE_LOOKUPS_TOTAL.labels(result="miss").inc()
+            return None
+
+        self.entries.move_to_end(key)
+        metrics.TOKEN_CACHE_LOOKUPS_TOTAL.labels(result="hit").inc()
+        return claims, token_data
+
+    def set(self, token: str, claims: dict[str, Any], token_data: TokenData) -> None:
+        """
+        Cache a verified token until its expiration.
+
+        Args:
+            token (str): The JWT.
+            claims (dict): The decoded claims of the token.
+            token_data (TokenData): The validated token data.
+        """
+        expires_at = claims.get("exp")
+        # Tokens without an expiration are never cached
+        if self.max_size <= 0 or not isinstance(expires_at, int | float):
+            return
+
+        self.entries[self.get_key(token)] = (float(expires_at), claims, token_data)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            metrics.TOKEN_CACHE_EVICTIONS_TOTAL.labels(reason="size").inc()
+
+    def add_revocation_hook(self, hook: RevocationHook) -> None:
+        """
+        Register a hook deciding whether a verified token has been revoked.
+
+        Args:
+            hook (RevocationHook): Async callable receiving the token claims.
+        """
+        self.revocation_hooks.append(hook)
+
+    async def is_revoked(self, claims: dict[str, Any]) -> bool:
+        """
+        Check the claims of a token against every revocation hook.
+
+        Args:
+            claims (dict): The decoded claims of the token.
+        Returns:
+            bool: True if any hook reports the token as revoked.
+        """
+        for hook in self.revocation_hooks:
+            if await hook(claims):
+                return True
+        return False
+
+    def invalidate(self, token: str) -> None:
+        """
+        Remove a token from the cache.
+
+        Args:
+            token (str): The JWT.
+        """
+        if self.entries.pop(self.get_key(token), None) is not None:
+            metrics.TOKEN_CACHE_EVICTIONS_TOTAL.labels(reason="invalidated").inc()
+
+    def invalidate_user(self, user_id: UUID) -> None:
+        """
+        Remove every cached token of a user, e.g. after a role or password change.
+
+        Args:
+            user_id (UUID): The ID of the user.
+        """
+        keys = [
+            key
+            for key, (_, _, token_data) in self.entries.items()
+            if token_data.user_id == user_id
+        ]
+        for key in keys:
+            del self.entries[key]
+        if keys:
+            metrics.TOKEN_CACHE_EVICTIONS_TOTAL.labels(reason="invalidated").inc(
+                len(keys)
+            )
+
+    def clear(self) -> None:
+        """
+        Remove every token from the cache.
+        """
+        self.entries.clear()
+
+
+class RevocationTimes:
+    """
+    A bounded in-process cache of the last revocation time of each user, read from Redis.
+
+    A time is kept for a few seconds, so a cached token is checked without any I/O. A
+    revocation made by another worker is thus seen within that delay.
+    """
+
+    def __init__(self, max_size: int, ttl: float) -> None:
+        """
+        Initialize the revocation time cache.
+
+        Args:
+            max_size (int): The maximum number of users to keep.
+            ttl (float): The number of seconds a revocation time is kept, 0 disables caching.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def get(self, user_id: str) -> float | None:
+        """
+        Get the cached revocation time of a user.
+
+        Args:
+            user_id (str): The ID of the user.
+        Returns:
+            float | None: The revocation time, 0 if the user was never revoked, or None on
+                a miss.
+        """
+        entry = self.entries.get(user_id)
+        if entry is None:
+            return None
+
+        checked_until, revoked_at = entry
+        if checked_until <= time.monotonic():
+            del self.entries[user_id]
+            return None
+
+        return revoked_at
+
+    def set(self, user_id: str, revoked_at: float) -> None:
+        """
+        Cache the revocation time of a user.
+
+        Args:
+            user_id (str): The ID of the user.
+            revoked_at (float): The revocation time, 0 if the user was never revoked.
+        """
+        if self.max_size <= 0 or self.ttl <= 0:
+            return
+
+        self.entries[user_id] = (time.monotonic() + self.ttl, revoked_at)
+        self.entries.move_to_end(user_id)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Remove every revocation time from the cache.
+        """
+        self.entries.clear()
+
+
+token_cache = TokenCache(max_size=security_settings.TOKEN_CACHE_MAX_SIZE)
+revocation_times = RevocationTimes(
+    max_size=security_settings.TOKEN_CACHE_MAX_SIZE,
+    ttl=security_settings.TOKEN_REVOCATION_CHECK_SECONDS,
+)
+
+
+async def revoke_user_tokens(user_id: UUID) -> None:
+    """
+    Revoke the access tokens issued to a user until now, e.g. after a password or role
+    change. The revocation time is stored in Redis so every worker of the service rejects
+    the tokens, cached or not, once its cached revocation time of the user expires.
+
+    Args:
+        user_id (UUID): The ID of the user.
+    """
+    revoked_at = time.time()
+    token_cache.invalidate_user(user_id)
+    revocation_times.set(str(user_id), revoked_at)
+    try:
+        redis = redis_client.get_client()
+        await redis.set(
+            f"revoked_tokens:{user_id}",
+            revoked_at,
+            ex=security_settings.TOKEN_REVOCATION_EXPIRES_MINUTES * 60,
+        )
+    except Exception as e:
+        logger.error(f"Failed to revoke the access tokens of {user_id}: {e!r}")
+
+
+async def is_user_token_revoked(claims: dict[str, Any]) -> bool:
+    """
+    Check whether an access token was issued before the last revocation of its user.
+
+    Refresh tokens are revoked by deleting them from the database instead.
+
+    Args:
+        claims (dict): The decoded claims of the token.
+    Returns:
+        bool: True if the token has been revoked.
+    """
+    if claims.get("type") != "access":
+        return False
+
+    user_id = str(claims.get("user_id"))
+    revoked_at = revocation_times.get(user_id)
+    if revoked_at is None:
+        try:
+            redis = redis_client.get_client()
+            value = await redis.get(f"revoked_tokens:{user_id}")
+            revoked_at = float(value) if value is not None else 0.0
+        except Exception as e:
+            # Tokens are still verified and expire, so authentication continues without Redis
+            logger.warning(f"Failed to check the revocation of {user_id}: {e!r}")
+            revoked_at = 0.0
+        revocation_times.set(user_id, revoked_at)
+
+    return float(claims.get("iat", 0)) < revoked_at
+
+
+token_cache.add_revocation_hook(is_user_token_revoked)
@@ -3,10 +3,10 @@ from uuid import UUID
 
 import jwt
 from argon2 import PasswordHasher, exceptions
-from fastapi.concurrency import run_in_threadpool
 from pydantic_settings import BaseSettings
 
 from libs.utils_lib.core.config import settings as utils_libs_settings
+from libs.utils_lib.core.timing import run_in_threadpool_timed
 
 
 # Security Settings
@@ -24,6 +24,13 @@ class SecuritySettings(BaseSettings):
     # Token expiration times
     EMAIL_VERIFICATION_EXPIRES_MINUTES: int = 30
     PASSWORD_RESET_EXPIRES_MINUTES: int = 15
+    # Revoked access tokens are rejected for this long, at least the access token lifetime
+    TOKEN_REVOCATION_EXPIRES_MINUTES: int = 15
+    # Seconds a worker keeps a user's revocation time before reading it again from Redis
+    TOKEN_REVOCATION_CHECK_SECONDS: int = 5
+
+    # Verified token cache size (0 disables caching)
+    TOKEN_CACHE_MAX_SIZE: int = 10000
 
 
 security_settings = SecuritySettings()
@@ -82,7 +89,7 @@ async def verify_password(plain_password: str, hashed_password: str) -> bool:
             # covers other verification errors
             return False
 
-    return await run_in_threadpool(verify)
+    return await run_in_threadpool_timed("argon2", verify)
 
 
 async def get_password_hash(password: str) -> str:
@@ -95,7 +102,7 @@ async def get_password_hash(password: str) -> str:
     Returns:
         str: The hashed password.
     """
-    return await run_in_threadpool(pwd_context.hash, password)
+    return await run_in_threadpool_timed("argon2", pwd_context.hash, password)
 
 
 # Username and password validation
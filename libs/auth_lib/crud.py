@@ -3,7 +3,7 @@ from uuid import UUID
 from fastapi import HTTPException, status
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from libs.users_lib.crud import get_user
+from libs.users_lib.crud import update_user
 from libs.users_lib.models import Users
 
 
@@ -20,18 +20,11 @@ async def verify_user_email(
     Returns:
         Users: The verified user.
     """
-    user = await get_user(session, user_id)
+    user = await update_user(session, user_id, {"verified": True}, commit)
 
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
 
-    user.verified = True
-    session.add(user)
-
-    if commit:
-        await session.commit()
-        await session.refresh(user)
-
     return user
@@ -2,10 +2,8 @@ from uuid import UUID, uuid4
 
 from fastapi import HTTPException, Request, status
 from fastapi.security.utils import get_authorization_scheme_param
-from jwt.exceptions import InvalidTokenError
-from pydantic import ValidationError
 
-from libs.auth_lib.api.deps import get_token_data
+from libs.auth_lib.api.deps import get_request_token_data
 from libs.auth_lib.core.security import security_settings as auth_lib_security_settings
 from libs.utils_lib.core.redis import redis_client
 from libs.utils_lib.core.security import gen_url_token, verify_url_token
@@ -28,9 +26,9 @@ async def get_user_id_from_request(request: Request) -> UUID | None:
         return None
 
     try:
-        token_data = await get_token_data(token, required_type="access")
+        token_data = await get_request_token_data(request, token)
         return token_data.user_id
-    except (InvalidTokenError, ValidationError, HTTPException):
+    except HTTPException:
         return None
 
 
@@ -1,11 +1,22 @@
+from typing import Any
 from uuid import UUID
 
 from fastapi import HTTPException, status
+from sqlalchemy import bindparam, update
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from libs.auth_lib.core.security import get_password_hash
 from libs.users_lib.models import UserRole, Users
+from libs.utils_lib.core.database import flag_user_write
+
+# Statements of the hot lookups are built once, so their SQL compilation is cached by the
+# engine and the same prepared statement is reused by asyncpg
+GET_USER_STATEMENT = select(Users).where(Users.id == bindparam("user_id"))
+GET_USER_BY_USERNAME_STATEMENT = select(Users).where(
+    Users.username == bindparam("username")
+)
+GET_USER_BY_EMAIL_STATEMENT = select(Users).where(Users.email == bindparam("email"))
 
 
 # CRUD operations for Users
@@ -20,8 +31,7 @@ async def get_user(session: AsyncSession, user_id: UUID) -> Users | None:
     Returns:
         Users: The user object or None.
     """
-    stmt = select(Users).where(Users.id == user_id)
-    result = await session.exec(stmt)
+    result = await session.exec(GET_USER_STATEMENT, params={"user_id": user_id})
     return result.one_or_none()
 
 
@@ -36,9 +46,9 @@ async def get_user_by_username(session: AsyncSession, username: str) -> Users |
     Returns:
         Users: The user object or None.
     """
-    stmt = select(Users).where(Users.username == username)
-
-    result = await session.exec(stmt)
+    result = await session.exec(
+        GET_USER_BY_USERNAME_STATEMENT, params={"username": username}
+    )
     return result.one_or_none()
 
 
@@ -53,11 +63,44 @@ async def get_user_by_email(session: AsyncSession, email: str) -> Users | None:
     Returns:
         Users: The user object or None.
     """
-    stmt = select(Users).where(Users.email == email)
-    result = await session.exec(stmt)
+    result = await session.exec(GET_USER_BY_EMAIL_STATEMENT, params={"email": email})
     return result.one_or_none()
 
 
+async def update_user(
+    session: AsyncSession, user_id: UUID, values: dict[str, Any], commit: bool = True
+) -> Users | None:
+    """
+    Update user fields with a single UPDATE ... RETURNING statement.
+
+    Args:
+        session (AsyncSession): The database session.
+        user_id (UUID): The user ID.
+        values (dict[str, Any]): The fields to update.
+        commit (bool): Commit at the end of the operation.
+
+    Returns:
+        Users: The updated user or None.
+    """
+    # populate_existing refreshes the user already loaded in the session with the row
+    stmt = (
+        update(Users)
+        .where(Users.id == user_id)  # type: ignore[arg-type]
+        .values(**values)
+        .returning(Users)
+        .execution_options(populate_existing=True)
+    )
+    result = await session.execute(stmt)
+    user: Users | None = result.scalars().one_or_none()
+    if user:
+        flag_user_write(session, user.id)
+
+    if commit:
+        await session.commit()
+
+    return user
+
+
 async def update_user_username(
     session: AsyncSession, user_id: UUID, new_username: str, commit: bool = True
 ) -> Users:
@@ -73,20 +116,13 @@ async def update_user_username(
     Returns:
         Users: The updated user.
     """
-    user = await get_user(session, user_id)
+    user = await update_user(session, user_id, {"username": new_username}, commit)
 
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
 
-    user.username = new_username
-    session.add(user)
-
-    if commit:
-        await session.commit()
-        await session.refresh(user)
-
     return user
 
 
@@ -105,20 +141,15 @@ async def update_user_password(
     Returns:
         Users: The updated user.
     """
-    user = await get_user(session, user_id)
+    user = await update_user(
+        session, user_id, {"password": await get_password_hash(new_password)}, commit
+    )
 
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
 
-    user.password = await get_password_hash(new_password)
-    session.add(user)
-
-    if commit:
-        await session.commit()
-        await session.refresh(user)
-
     return user
 
 
@@ -137,18 +168,11 @@ async def update_user_role(
     Returns:
         Users: The updated user.
     """
-    user = await get_user(session, user_id)
+    user = await update_user(session, user_id, {"role": role}, commit)
 
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
 
-    user.role = role
-    session.add(user)
-
-    if commit:
-        await session.commit()
-        await session.refresh(user)
-
     return user
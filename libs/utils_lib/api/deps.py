@@ -1,17 +1,88 @@
+import logging
 from collections.abc import AsyncGenerator
 from typing import Annotated
 
-from fastapi import Depends
+from fastapi import Depends, Request
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from libs.auth_lib.utils import get_user_id_from_request
+from libs.utils_lib.core.config import settings as utils_lib_settings
 from libs.utils_lib.core.database import session_manager
+from libs.utils_lib.core.redis import redis_client
 from libs.utils_lib.core.security import get_client_ip
 
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+
+async def record_user_write(request: Request, session: AsyncSession) -> None:
+    """
+    Store the WAL position of the committed writes under the requesting user and the
+    users flagged as written (see flag_user_write), so their following reads wait for the
+    replica to replay them.
+
+    Args:
+        request (Request): The incoming HTTP request.
+        session (AsyncSession): The primary database session which committed the writes.
+    """
+    user_ids = set(session.info.get("committed_user_writes", ()))
+    requester_id = await get_user_id_from_request(request)
+    if requester_id:
+        user_ids.add(str(requester_id))
+    if not user_ids:
+        return
+
+    try:
+        lsn = await session_manager.get_write_lsn(session)
+        redis = redis_client.get_client()
+        pipe = redis.pipeline(transaction=False)
+        for user_id in user_ids:
+            pipe.set(
+                f"ryw:{user_id}",
+                lsn,
+                ex=utils_lib_settings.POSTGRES_READ_YOUR_WRITES_TTL,
+            )
+        await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Failed to record the write position of {user_ids}: {e!r}")
+
+
+async def has_replayed_user_writes(request: Request, session: AsyncSession) -> bool:
+    """
+    Check whether the replica has replayed the recent writes of the requesting user.
+
+    Args:
+        request (Request): The incoming HTTP request.
+        session (AsyncSession): The read replica session.
+    Returns:
+        bool: True if the replica can serve the reads of the user.
+    """
+    # Without replicas every read uses the primary, there is nothing to wait for
+    if not session_manager.replicas:
+        return True
+
+    user_id = await get_user_id_from_request(request)
+    if not user_id:
+        return True
+
+    try:
+        redis = redis_client.get_client()
+        lsn = await redis.get(f"ryw:{user_id}")
+        if not lsn:
+            return True
+        return await session_manager.has_replayed(session, lsn)
+    except Exception as e:
+        # Without the write position, reads fall back to the primary
+        logger.warning(f"Failed to check the write position of {user_id}: {e!r}")
+        return False
+
+
+async def get_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
     """
     Get the database session from the session manager.
 
+    Args:
+        request (Request): The incoming HTTP request.
     Yields:
         AsyncSession: The database session.
     """
@@ -19,26 +90,65 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         raise Exception("Session manager not initialized")
     async with session_manager.session_maker() as session:
         yield session
+        if session_manager.replicas and session.info.get("committed_writes"):
+            await record_user_write(request, session)
 
 
-async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
     """
     Get the read-only database session from the session manager.
 
+    Reads are balanced across the healthy replicas, falling back to the primary when none
+    is healthy. Reads of a user who wrote recently use the primary until the replica has
+    replayed their writes (read-your-writes).
+
+    Args:
+        request (Request): The incoming HTTP request.
     Yields:
         AsyncSession: The database session.
     """
-    if session_manager.read_session_maker:
-        async with session_manager.read_session_maker() as session:
-            yield session
-    elif session_manager.session_maker:
+    replica = session_manager.get_replica()
+    if replica:
+        async with replica.get_session() as session:
+            if await has_replayed_user_writes(request, session):
+                yield session
+                return
+
+    if session_manager.session_maker:
         async with session_manager.session_maker() as session:
             yield session
     else:
         raise Exception("Session maker not initialized")
 
 
+async def get_hedged_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Get a read-only database session hedging slow queries, for latency-critical reads.
+
+    Queries run with exec() slower than a percentile of the recent query latencies are
+    re-issued to another replica (or the primary) and the first result is used. The other
+    session methods (get, execute, scalar) are not hedged. A request holds up to two
+    connections, one of the replica and, once hedged, one of the backup.
+
+    Args:
+        request (Request): The incoming HTTP request.
+    Yields:
+        AsyncSession: The database session.
+    """
+    replica = session_manager.get_replica()
+    if replica:
+        async with session_manager.get_hedged_session(replica) as session:
+            # Checked on the query session, so the replica is only connected to once
+            if await has_replayed_user_writes(request, session.query_session):
+                yield session
+                return
+
+    async with session_manager.get_session() as session:
+        yield session
+
+
 async_session_dep = Annotated[AsyncSession, Depends(get_db)]
 async_read_session_dep = Annotated[AsyncSession, Depends(get_read_db)]
+async_hedged_read_session_dep = Annotated[AsyncSession, Depends(get_hedged_read_db)]
 
 client_ip_dep = Annotated[str, Depends(get_client_ip)]
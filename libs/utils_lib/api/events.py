@@ -10,6 +10,7 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 
 from libs.utils_lib.api.deps import async_session_dep
 from libs.utils_lib.core.faststream import nats
+from libs.utils_lib.core.timing import timed
 from libs.utils_lib.crud import (
     create_inbox_event,
     get_inbox_event,
@@ -200,7 +201,8 @@ async def handle_publish_event(
         EventOutbox: The event outbox record.
     """
     try:
-        await nats.broker.publish(event_schema, subject=event.event_type)
+        with timed("nats"):
+            await nats.broker.publish(event_schema, subject=event.event_type)
     except Exception as e:
         log = f"Error publishing event: {event.id} - {str(e)}"
 
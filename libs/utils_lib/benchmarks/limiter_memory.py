@@ -0,0 +1,114 @@
+"""
+Benchmark the Redis memory used by rate limiter state in the "keys" and "hash" layouts.
+
+Every simulated identity hits each route of ROUTES once, using the production limiter
+scripts, and the growth of used_memory is reported per identity for each layout.
+
+Usage:
+    python -m libs.utils_lib.benchmarks.limiter_memory --redis-url redis://localhost:6379 --db 15
+
+The selected database is flushed before and after each run, never point it at live data.
+"""
+
+import argparse
+import asyncio
+import random
+
+from redis.asyncio import Redis
+
+from libs.utils_lib.core.limiter import (
+    REDIS_LUA_HASH_SCRIPTS,
+    REDIS_LUA_SCRIPTS,
+    Limiter,
+    LimiterAlgorithm,
+    LimiterStorage,
+)
+
+# (target, rules) of the rate-limited routes an identity typically touches
+ROUTES = [
+    ("POST:/login", "10/minute,50/hour,200/day"),
+    ("POST:/register", "5/minute,25/hour,50/day"),
+    ("POST:/token/refresh", "10/minute,60/hour"),
+    ("GET:/utils/health", "30/minute"),
+    ("shared", "200/minute,2000/hour"),
+]
+
+
+async def measure(
+    redis: Redis,
+    storage: LimiterStorage,
+    algorithm: LimiterAlgorithm,
+    identities: int,
+    batch_size: int,
+) -> tuple[int, int]:
+    """
+    Populate limiter state for the given number of identities and measure its memory.
+
+    Args:
+        redis (Redis): The Redis client of the benchmark database.
+        storage (LimiterStorage): The storage layout to benchmark.
+        algorithm (LimiterAlgorithm): The rate limiting algorithm to benchmark.
+        identities (int): Number of distinct client IPs to simulate.
+        batch_size (int): Number of script calls sent per pipeline.
+    Returns:
+        tuple[int, int]: Bytes of used memory added and number of keys created.
+    """
+    await redis.flushdb()
+    limiters = []
+    for target, rules in ROUTES:
+        limiter = Limiter(rules, algorithm=algorithm)
+        limiter.storage = storage
+        limiters.append((target, limiter))
+    scripts = REDIS_LUA_HASH_SCRIPTS if storage == "hash" else REDIS_LUA_SCRIPTS
+    script = redis.register_script(scripts[algorithm])
+
+    baseline = (await redis.info("memory"))["used_memory"]
+    pipe = redis.pipeline(transaction=False)
+    for index in range(identities):
+        identity = f"10.{random.randint(0, 255)}.{index // 256 % 256}.{index % 256}"
+        for target, limiter in limiters:
+            keys, args = limiter.get_script_call(identity, target, limiter.cost)
+            await script(keys=keys, args=args, client=pipe)
+        if len(pipe) >= batch_size:
+            await pipe.execute()
+    await pipe.execute()
+
+    used = (await redis.info("memory"))["used_memory"] - baseline
+    return used, await redis.dbsize()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--redis-url", default="redis://localhost:6379")
+    parser.add_argument("--db", type=int, default=15)
+    parser.add_argument("--identities", type=int, default=50000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument(
+        "--algorithm",
+        choices=sorted(REDIS_LUA_HASH_SCRIPTS),
+        default="fixed_window",
+    )
+    options = parser.parse_args()
+
+    redis = Redis.from_url(options.redis_url, db=options.db)
+    try:
+        print(f"{options.identities} identities x {len(ROUTES)} routes")
+        for storage in ("keys", "hash"):
+            used, keys = await measure(
+                redis,
+                storage,
+                options.algorithm,
+                options.identities,
+                options.batch_size,
+            )
+            print(
+                f"{storage:>5}: {keys} keys, {used / 1024 / 1024:.1f} MiB, "
+                f"{used / options.identities:.0f} bytes per identity"
+            )
+    finally:
+        await redis.flushdb()
+        await redis.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,139 @@
+"""
+Benchmark the outbox resend queries as the number of processed events grows.
+
+The outbox is seeded in a scratch schema with a fixed number of pending and failed events
+and a growing number of processed ones. get_pending_outbox_events and
+get_failed_outbox_events are timed at each size, along with the plan Postgres picks. With
+the partial status index their time follows the pending and failed events, not the total.
+
+Usage:
+    python -m libs.utils_lib.benchmarks.outbox_query --totals 10000,100000,1000000
+
+The scratch schema is dropped before and after each run, the service tables are not used.
+"""
+
+import argparse
+import asyncio
+import time
+from typing import cast
+
+from sqlalchemy import Table, inspect, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from libs.utils_lib.core.config import settings
+from libs.utils_lib.crud import get_failed_outbox_events, get_pending_outbox_events
+from libs.utils_lib.models import EventOutbox
+
+SCHEMA = "outbox_benchmark"
+
+SEED_SQL = """
+INSERT INTO eventoutbox (id, event_type, status, retries, created_at, data)
+SELECT gen_random_uuid(), 'benchmark', '{status}', 0,
+       now() - interval '1 hour' * random(), '{{"benchmark": true}}'::jsonb
+FROM generate_series(1, {count})
+"""
+
+
+async def seed(engine: AsyncEngine, status: str, count: int) -> None:
+    """
+    Insert outbox events with the given status.
+
+    Args:
+        engine (AsyncEngine): The engine of the scratch schema.
+        status (str): The status of the events.
+        count (int): Number of events to insert.
+    """
+    if count <= 0:
+        return
+    async with engine.begin() as connection:
+        await connection.execute(text(SEED_SQL.format(status=status, count=count)))
+        await connection.execute(text("ANALYZE eventoutbox"))
+
+
+async def measure(engine: AsyncEngine, repeats: int) -> tuple[float, float, str]:
+    """
+    Time the resend queries and get the plan of the pending events query.
+
+    Args:
+        engine (AsyncEngine): The engine of the scratch schema.
+        repeats (int): Number of times each query runs.
+    Returns:
+        tuple[float, float, str]: Milliseconds per pending and failed events query, and
+            the top node of the pending events query plan.
+    """
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        start = time.perf_counter()
+        for _ in range(repeats):
+            await get_pending_outbox_events(session, time=5)
+            session.expunge_all()
+        pending = (time.perf_counter() - start) / repeats * 1000
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            await get_failed_outbox_events(session)
+            session.expunge_all()
+        failed = (time.perf_counter() - start) / repeats * 1000
+
+    async with engine.connect() as connection:
+        result = await connection.execute(
+            text(
+                "EXPLAIN SELECT * FROM eventoutbox "
+                "WHERE status = 'pending' AND created_at < now() - interval '5 minutes'"
+            )
+        )
+        plan = str(result.scalars().first()).split("  (")[0].strip()
+
+    return pending, failed, plan
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--database-url", default=str(settings.DATABASE_URL))
+    parser.add_argument("--totals", default="10000,100000,1000000")
+    parser.add_argument("--pending", type=int, default=100)
+    parser.add_argument("--failed", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=20)
+    options = parser.parse_args()
+    totals = sorted(int(total) for total in options.totals.split(","))
+
+    admin = create_async_engine(options.database_url, isolation_level="AUTOCOMMIT")
+    engine = create_async_engine(
+        options.database_url,
+        connect_args={"server_settings": {"search_path": SCHEMA}},
+    )
+    try:
+        async with admin.connect() as connection:
+            await connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            await connection.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        async with engine.begin() as connection:
+            table = cast(Table, inspect(EventOutbox).local_table)
+            await connection.run_sync(EventOutbox.metadata.create_all, tables=[table])
+            await connection.execute(
+                text(
+                    "CREATE TABLE eventoutbox_default PARTITION OF eventoutbox DEFAULT"
+                )
+            )
+
+        await seed(engine, "pending", options.pending)
+        await seed(engine, "failed", options.failed)
+        seeded = options.pending + options.failed
+
+        print(f"{options.pending} pending and {options.failed} failed events")
+        for total in totals:
+            await seed(engine, "processed", total - seeded)
+            seeded = max(total, seeded)
+            pending, failed, plan = await measure(engine, options.repeats)
+            print(
+                f"{total:>10} events: pending {pending:.2f} ms, "
+                f"failed {failed:.2f} ms, {plan}"
+            )
+    finally:
+        async with admin.connect() as connection:
+            await connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await engine.dispose()
+        await admin.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
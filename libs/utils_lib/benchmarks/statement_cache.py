@@ -0,0 +1,95 @@
+"""
+Benchmark the per-call cost of user lookups with rebuilt and prebuilt statements.
+
+The same lookup by ID runs with a select() built on every call (as the CRUD modules did)
+and with the prebuilt bindparam statement of libs.users_lib.crud, each with the asyncpg
+prepared statement cache disabled and enabled. The CPU time of the process and the wall
+time are reported per call, the looked up IDs do not need to exist.
+
+Usage:
+    python -m libs.utils_lib.benchmarks.statement_cache --calls 5000
+"""
+
+import argparse
+import asyncio
+import time
+from uuid import uuid4
+
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from libs.users_lib.crud import GET_USER_STATEMENT
+from libs.users_lib.models import Users
+from libs.utils_lib.core.config import settings
+
+
+async def measure(
+    database_url: str, prebuilt: bool, prepared_statement_cache_size: int, calls: int
+) -> tuple[float, float]:
+    """
+    Run the user lookups and measure their cost.
+
+    Args:
+        database_url (str): The database URL.
+        prebuilt (bool): Whether to use the prebuilt statement.
+        prepared_statement_cache_size (int): The asyncpg prepared statement cache size.
+        calls (int): Number of lookups to run.
+    Returns:
+        tuple[float, float]: Microseconds of CPU and wall time per call.
+    """
+    connect_args = {}
+    if "asyncpg" in database_url:
+        connect_args["prepared_statement_cache_size"] = prepared_statement_cache_size
+    engine = create_async_engine(database_url, connect_args=connect_args)
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            # Warm up the connection and the caches
+            await session.exec(GET_USER_STATEMENT, params={"user_id": uuid4()})
+
+            cpu_start = time.process_time()
+            wall_start = time.perf_counter()
+            for _ in range(calls):
+                if prebuilt:
+                    result = await session.exec(
+                        GET_USER_STATEMENT, params={"user_id": uuid4()}
+                    )
+                else:
+                    result = await session.exec(
+                        select(Users).where(Users.id == uuid4())
+                    )
+                result.one_or_none()
+            cpu = time.process_time() - cpu_start
+            wall = time.perf_counter() - wall_start
+    finally:
+        await engine.dispose()
+
+    return cpu / calls * 1e6, wall / calls * 1e6
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--database-url", default=str(settings.DATABASE_URL))
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument(
+        "--prepared-statement-cache-size",
+        type=int,
+        default=settings.POSTGRES_PREPARED_STATEMENT_CACHE_SIZE,
+    )
+    options = parser.parse_args()
+
+    print(f"{options.calls} lookups per run")
+    for cache_size in (0, options.prepared_statement_cache_size):
+        for prebuilt in (False, True):
+            cpu, wall = await measure(
+                options.database_url, prebuilt, cache_size, options.calls
+            )
+            statement = "prebuilt" if prebuilt else "rebuilt"
+            print(
+                f"{statement:>8}, prepared statement cache {cache_size:>4}: "
+                f"{cpu:.1f} us CPU, {wall:.1f} us wall per call"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,81 @@
+"""
+Report the resident memory of the worker processes of a running server.
+
+RSS counts every page mapped by a worker, including those shared with the master and
+the other workers, while USS only counts the pages private to the worker (the memory
+freed if it exited). Compare a preloaded server with one importing the app per worker:
+
+    python -m libs.utils_lib.server src.main:app --workers 4
+    fastapi run --workers 4 src/main.py
+
+Usage:
+    python -m libs.utils_lib.benchmarks.worker_memory --pid <master pid>
+
+Linux only, the figures are read from /proc.
+"""
+
+import argparse
+from pathlib import Path
+
+
+def get_children(pid: int) -> list[int]:
+    """
+    Get the child processes of a process.
+
+    Args:
+        pid (int): The process ID of the parent.
+    Returns:
+        list[int]: The process IDs of the children.
+    """
+    children: list[int] = []
+    for task in Path(f"/proc/{pid}/task").iterdir():
+        children.extend(int(child) for child in (task / "children").read_text().split())
+    return children
+
+
+def get_memory(pid: int) -> dict[str, int]:
+    """
+    Get the RSS, PSS and USS of a process.
+
+    Args:
+        pid (int): The process ID.
+    Returns:
+        dict[str, int]: The memory figures in bytes.
+    """
+    fields = {}
+    for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines()[1:]:
+        name, value = line.split(":", 1)
+        fields[name] = int(value.split()[0]) * 1024
+    return {
+        "rss": fields["Rss"],
+        "pss": fields["Pss"],
+        "uss": fields["Private_Clean"] + fields["Private_Dirty"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--pid", type=int, required=True, help="The master process ID")
+    options = parser.parse_args()
+
+    rows = [("master", options.pid)]
+    rows += [("worker", pid) for pid in get_children(options.pid)]
+
+    totals = {"rss": 0, "pss": 0, "uss": 0}
+    print(f"{'process':>8} {'pid':>8} {'RSS MiB':>9} {'PSS MiB':>9} {'USS MiB':>9}")
+    for role, pid in rows:
+        memory = get_memory(pid)
+        for key in totals:
+            totals[key] += memory[key]
+        print(
+            f"{role:>8} {pid:>8} {memory['rss'] / 2**20:>9.1f} "
+            f"{memory['pss'] / 2**20:>9.1f} {memory['uss'] / 2**20:>9.1f}"
+        )
+    print(
+        f"{'total':>8} {'':>8} {totals['rss'] / 2**20:>9.1f} "
+        f"{totals['pss'] / 2**20:>9.1f} {totals['uss'] / 2**20:>9.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -26,10 +26,34 @@ class Settings(BaseSettings):
     POSTGRES_CONNECTION_SCHEME: str = "postgressql"
     POSTGRES_SERVER: str
     POSTGRES_READ_SERVER: str | None = None
+    # Additional read replicas (comma separated hosts)
+    POSTGRES_READ_SERVERS: str | None = None
     POSTGRES_DB: str
     POSTGRES_PORT: int = 5432
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str
+    # Compiled SQL statements cached per engine, and statements asyncpg keeps prepared per connection
+    POSTGRES_QUERY_CACHE_SIZE: int = 500
+    POSTGRES_PREPARED_STATEMENT_CACHE_SIZE: int = 500
+    # Statements run more times than this by one request or task are logged as N+1 queries
+    POSTGRES_REPEATED_STATEMENT_THRESHOLD: int = 10
+    # Seconds the reads of a user are checked against the replica after one of their writes
+    POSTGRES_READ_YOUR_WRITES_TTL: int = 60
+    # Seconds between replica health probes, and replication lag ejecting a replica
+    POSTGRES_READ_PROBE_INTERVAL: float = 5.0
+    POSTGRES_READ_MAX_LAG: float = 10.0
+    # Hedged reads re-issue queries slower than this percentile of recent query latencies,
+    # bounded below by the minimum delay, and use the default delay until enough samples
+    POSTGRES_HEDGE_PERCENTILE: float = 95.0
+    POSTGRES_HEDGE_MIN_DELAY: float = 0.005
+    POSTGRES_HEDGE_DEFAULT_DELAY: float = 0.05
+
+    # Event outbox/inbox daily partitions created ahead, days of events kept per table, and
+    # schema receiving expired partitions (dropped if unset)
+    EVENT_PARTITION_PREMAKE_DAYS: int = 3
+    EVENT_OUTBOX_RETENTION_DAYS: int = 7
+    EVENT_INBOX_RETENTION_DAYS: int = 7
+    EVENT_PARTITION_ARCHIVE_SCHEMA: str | None = None
 
     # Redis settings
     REDIS_URL: str
@@ -37,6 +61,29 @@ class Settings(BaseSettings):
     # NATS settings
     NATS_URL: str
 
+    # Prometheus settings
+    # Request latency histogram buckets in seconds
+    PROMETHEUS_LATENCY_BUCKETS: list[float] = [
+        0.001,
+        0.0025,
+        0.005,
+        0.0075,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1.0,
+        2.5,
+        5.0,
+        10.0,
+    ]
+    # Label the request latency histogram with the status code (one series per status)
+    PROMETHEUS_STATUS_CODE_LABEL: bool = True
+    # Return the time breakdown of requests to clients in a Server-Timing header
+    PROMETHEUS_SERVER_TIMING: bool = False
+
     @computed_field  # type: ignore[prop-decorator]
     @property
     def DATABASE_URL(self) -> MultiHostUrl:
@@ -51,17 +98,25 @@ class Settings(BaseSettings):
 
     @computed_field  # type: ignore[prop-decorator]
     @property
-    def READ_DATABASE_URL(self) -> MultiHostUrl | None:
-        if self.POSTGRES_READ_SERVER:
-            return MultiHostUrl.build(
+    def READ_DATABASE_URLS(self) -> list[MultiHostUrl]:
+        hosts = [self.POSTGRES_READ_SERVER] if self.POSTGRES_READ_SERVER else []
+        if self.POSTGRES_READ_SERVERS:
+            hosts += [
+                host.strip()
+                for host in self.POSTGRES_READ_SERVERS.split(",")
+                if host.strip() and host.strip() not in hosts
+            ]
+        return [
+            MultiHostUrl.build(
                 scheme=f"{self.POSTGRES_CONNECTION_SCHEME}+asyncpg",
                 username=self.POSTGRES_USER,
                 password=self.POSTGRES_PASSWORD,
-                host=self.POSTGRES_READ_SERVER,
+                host=host,
                 port=self.POSTGRES_PORT,
                 path=self.POSTGRES_DB,
             )
-        return None
+            for host in hosts
+        ]
 
     @computed_field  # type: ignore[prop-decorator]
     @property
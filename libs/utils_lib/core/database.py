@@ -1,18 +1,521 @@
+import asyncio
 import logging
-from collections.abc import AsyncGenerator
-from contextlib import asynccontextmanager
+import random
+import time
+from collections import deque
+from collections.abc import AsyncGenerator, Callable, Iterator
+from contextlib import (
+    AbstractAsyncContextManager,
+    AsyncExitStack,
+    asynccontextmanager,
+    contextmanager,
+    suppress,
+)
+from contextvars import ContextVar
+from typing import Any, ClassVar
+from uuid import UUID
 
-from sqlalchemy import text
+from prometheus_client import Counter, Gauge, Histogram
+from pydantic_settings import BaseSettings
+from sqlalchemy import event, text
+from sqlalchemy.engine import FrozenResult
 from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import ORMExecuteState
+from sqlalchemy.orm.loading import merge_frozen_result
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection, QueuePool
+from sqlmodel import Session
 from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.sql.expression import SelectOfScalar
 
 # from sqlmodel import SQLModel
 from libs.utils_lib.core.config import settings as utils_lib_settings
+from libs.utils_lib.core.timing import record
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+class Metrics(BaseSettings):
+    DB_STATEMENT_DURATION: ClassVar[Histogram] = Histogram(
+        "db_statement_duration_seconds",
+        "Database statement execution time in seconds",
+        ["engine"],
+        buckets=utils_lib_settings.PROMETHEUS_LATENCY_BUCKETS,
+    )
+    DB_STATEMENTS_PER_OPERATION: ClassVar[Histogram] = Histogram(
+        "db_statements_per_operation",
+        "Database statements executed per request or task",
+        ["operation"],
+        buckets=(1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+    )
+    DB_TIME_PER_OPERATION: ClassVar[Histogram] = Histogram(
+        "db_time_per_operation_seconds",
+        "Database statement execution time per request or task in seconds",
+        ["operation"],
+        buckets=utils_lib_settings.PROMETHEUS_LATENCY_BUCKETS,
+    )
+    DB_REPEATED_STATEMENTS_TOTAL: ClassVar[Counter] = Counter(
+        "db_repeated_statements_total",
+        "Statements run more than the N+1 threshold by a single request or task",
+        ["operation"],
+    )
+    DB_POOL_WAIT: ClassVar[Histogram] = Histogram(
+        "db_pool_checkout_wait_seconds",
+        "Time spent checking out a connection from the pool, excluding new connections, in seconds",
+        ["engine"],
+        buckets=utils_lib_settings.PROMETHEUS_LATENCY_BUCKETS,
+    )
+    DB_POOL_CONNECT: ClassVar[Histogram] = Histogram(
+        "db_pool_connect_seconds",
+        "Time spent opening new database connections in seconds",
+        ["engine"],
+        buckets=utils_lib_settings.PROMETHEUS_LATENCY_BUCKETS,
+    )
+    DB_POOL_CHECKED_OUT: ClassVar[Gauge] = Gauge(
+        "db_pool_checked_out_connections",
+        "Connections currently checked out of the pool",
+        ["engine"],
+        multiprocess_mode="livesum",
+    )
+    DB_POOL_OVERFLOW: ClassVar[Gauge] = Gauge(
+        "db_pool_overflow_connections",
+        "Connections currently open beyond the pool size",
+        ["engine"],
+        multiprocess_mode="livesum",
+    )
+    DB_HEDGED_READS_TOTAL: ClassVar[Counter] = Counter(
+        "db_hedged_reads_total",
+        "Read queries re-issued to a backup database, by the query returned first",
+        ["winner"],
+    )
+    DB_REPLICA_HEALTHY: ClassVar[Gauge] = Gauge(
+        "db_replica_healthy",
+        "Whether a read replica receives traffic (1) or is ejected (0)",
+        ["replica"],
+        multiprocess_mode="livemin",
+    )
+    DB_REPLICA_LAG: ClassVar[Gauge] = Gauge(
+        "db_replica_lag_seconds",
+        "Replication lag of a read replica in seconds",
+        ["replica"],
+        multiprocess_mode="livemax",
+    )
+
+
+metrics = Metrics()
+
+
+class StatementStats:
+    """
+    Statements executed by a request or task.
+    """
+
+    __slots__ = ("count", "duration", "statements")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0
+        self.statements: dict[str, int] = {}
+
+
+# Statements of the current request or task, None outside of tracked operations
+statement_stats: ContextVar[StatementStats | None] = ContextVar(
+    "statement_stats", default=None
+)
+
+
+@contextmanager
+def track_statements(operation: str) -> Iterator[StatementStats]:
+    """
+    Record the database statements executed by a request or task, and flag N+1 queries.
+
+    Args:
+        operation (str): The route template or task name.
+    Yields:
+        StatementStats: The statements executed so far.
+    """
+    stats = StatementStats()
+    token = statement_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        statement_stats.reset(token)
+        if stats.count:
+            metrics.DB_STATEMENTS_PER_OPERATION.labels(operation=operation).observe(
+                stats.count
+            )
+            metrics.DB_TIME_PER_OPERATION.labels(operation=operation).observe(
+                stats.duration
+            )
+        threshold = utils_lib_settings.POSTGRES_REPEATED_STATEMENT_THRESHOLD
+        for statement, count in stats.statements.items():
+            if count > threshold:
+                metrics.DB_REPEATED_STATEMENTS_TOTAL.labels(operation=operation).inc()
+                logger.warning(
+                    f"Possible N+1 query, statement executed {count} times by "
+                    f"{operation}: {statement[:200]}"
+                )
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Connection pool timing its checkouts.
+
+    No pool event marks the start of a checkout, so the public connect() is timed, less
+    the time spent opening a new connection (reported apart, see instrument_engine). The
+    pool_logging_name of the engine is used as the engine label of the metrics.
+    """
+
+    def connect(self) -> PoolProxiedConnection:
+        start = time.perf_counter()
+        connection = super().connect()
+        seconds = time.perf_counter() - start
+        seconds -= connection.info.pop("connect_seconds", 0.0)
+        record("db_pool_wait", seconds)
+        metrics.DB_POOL_WAIT.labels(engine=self.logging_name).observe(seconds)
+        return connection
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    """
+    Record the execution time and count of the statements of an engine, the time spent
+    opening connections and the usage of its pool.
+
+    Statement time is attributed to the current request (see core/timing.py) and to the
+    operation tracked by track_statements.
+
+    Args:
+        engine (AsyncEngine): The engine to instrument.
+        name (str): The engine label of the metrics.
+    """
+    statement_duration = metrics.DB_STATEMENT_DURATION.labels(engine=name)
+    connect_duration = metrics.DB_POOL_CONNECT.labels(engine=name)
+    checked_out = metrics.DB_POOL_CHECKED_OUT.labels(engine=name)
+    overflow = metrics.DB_POOL_OVERFLOW.labels(engine=name)
+    pool = engine.sync_engine.pool
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn: Any, *_: Any) -> None:
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn: Any, _cursor: Any, statement: str, *_: Any) -> None:
+        seconds = time.perf_counter() - conn.info["query_start_time"].pop()
+        record("db", seconds)
+        statement_duration.observe(seconds)
+        stats = statement_stats.get()
+        if stats is not None:
+            stats.count += 1
+            stats.duration += seconds
+            stats.statements[statement] = stats.statements.get(statement, 0) + 1
+
+    @event.listens_for(engine.sync_engine, "do_connect")
+    def do_connect(_dialect: Any, connection_record: Any, *_: Any) -> None:
+        connection_record.info["connect_start_time"] = time.perf_counter()
+
+    @event.listens_for(pool, "connect")
+    def connect(_dbapi_connection: Any, connection_record: Any) -> None:
+        start = connection_record.info.pop("connect_start_time", None)
+        if start is None:
+            return
+        seconds = time.perf_counter() - start
+        # Subtracted from the checkout wait of the connection (see TimedQueuePool)
+        connection_record.info["connect_seconds"] = seconds
+        record("db_connect", seconds)
+        connect_duration.observe(seconds)
+
+    if not isinstance(pool, QueuePool):
+        return
+    # Counted from the events, the counters of the pool lag while returned overflow
+    # connections are being closed
+    open_connections = 0
+
+    def update_overflow(change: int) -> None:
+        nonlocal open_connections
+        open_connections += change
+        overflow.set(max(open_connections - pool.size(), 0))
+
+    event.listen(pool, "connect", lambda *_: update_overflow(1))
+    event.listen(pool, "close", lambda *_: update_overflow(-1))
+    event.listen(pool, "detach", lambda *_: update_overflow(-1))
+    event.listen(pool, "checkout", lambda *_: checked_out.inc())
+    event.listen(pool, "checkin", lambda *_: checked_out.dec())
+
+
+# Sessions flag their committed writes in session.info for read-your-writes routing
+@event.listens_for(Session, "after_flush")
+def after_flush(session: Session, *_: Any) -> None:
+    session.info["pending_writes"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def do_orm_execute(state: ORMExecuteState) -> None:
+    if state.is_insert or state.is_update or state.is_delete:
+        state.session.info["pending_writes"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def after_commit(session: Session) -> None:
+    if session.info.pop("pending_writes", False):
+        session.info["committed_writes"] = True
+    user_ids = session.info.pop("pending_user_writes", set())
+    session.info.setdefault("committed_user_writes", set()).update(user_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def after_rollback(session: Session) -> None:
+    session.info.pop("pending_writes", None)
+    session.info.pop("pending_user_writes", None)
+
+
+def flag_user_write(session: AsyncSession, user_id: UUID) -> None:
+    """
+    Flag a user whose data the session writes, so the reads of that user wait for the
+    replica to replay the write, also when another user (e.g. an admin) made it.
+
+    Args:
+        session (AsyncSession): The database session writing the user.
+        user_id (UUID): The ID of the written user.
+    """
+    session.info.setdefault("pending_user_writes", set()).add(str(user_id))
+
+
+class ReadReplica:
+    """
+    A read replica with its own engine, health state and outstanding sessions.
+
+    Args:
+        host (str): The host of the replica.
+        engine (AsyncEngine): The engine of the replica.
+    """
+
+    def __init__(self, host: str, engine: AsyncEngine) -> None:
+        self.host = host
+        self.engine = engine
+        self.session_maker = async_sessionmaker(
+            bind=engine,
+            expire_on_commit=False,
+            autocommit=False,
+            autoflush=False,
+            class_=AsyncSession,
+        )
+        self.healthy = True
+        self.lag: float | None = None
+        self.outstanding = 0
+
+    @asynccontextmanager
+    async def get_session(self) -> AsyncGenerator[AsyncSession, None]:
+        """
+        Gets a session of the replica, counted as outstanding until closed.
+
+        Yields:
+            AsyncSession: The database session.
+        """
+        self.outstanding += 1
+        try:
+            async with self.session_maker() as session:
+                yield session
+        finally:
+            self.outstanding -= 1
+
+    async def get_lag(self) -> float:
+        """
+        Gets the replication lag of the replica.
+
+        Returns:
+            float: The replication lag in seconds.
+        """
+        async with self.engine.connect() as connection:
+            # Without pending WAL the replica is caught up, however old its last replay
+            result = await connection.execute(
+                text(
+                    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() "
+                    "THEN 0 ELSE COALESCE(EXTRACT(EPOCH FROM now() - "
+                    "pg_last_xact_replay_timestamp()), 0) END"
+                )
+            )
+            return float(result.scalar() or 0)
+
+    async def probe(self) -> None:
+        """
+        Checks the replica is reachable and its replication lag is acceptable.
+        """
+        lag: float | None = None
+        try:
+            lag = await asyncio.wait_for(
+                self.get_lag(),
+                timeout=utils_lib_settings.POSTGRES_READ_PROBE_INTERVAL,
+            )
+            healthy = lag <= utils_lib_settings.POSTGRES_READ_MAX_LAG
+        except Exception as e:
+            logger.warning(f"Read replica {self.host} probe failed: {e!r}")
+            healthy = False
+
+        if healthy != self.healthy:
+            if healthy:
+                logger.info(f"Read replica {self.host} is healthy again.")
+            else:
+                logger.warning(f"Read replica {self.host} ejected (lag: {lag}).")
+        self.healthy, self.lag = healthy, lag
+        metrics.DB_REPLICA_HEALTHY.labels(replica=self.host).set(int(healthy))
+        if lag is not None:
+            metrics.DB_REPLICA_LAG.labels(replica=self.host).set(lag)
+
+
+class HedgedReadSession(AsyncSession):
+    """
+    Read-only session re-issuing slow queries to a backup database.
+
+    Only exec() is hedged, get(), execute(), scalar() and refreshes run on this session
+    without hedging. Hedged queries run on a query session of the replica and, when still
+    running after the hedge delay (a percentile of the recent query latencies), again on
+    the backup session. The first result is merged into this session and the other query
+    is cancelled, its session invalidated so the connection is not returned to the pool.
+    Once the backup wins, the following queries go to it directly.
+
+    A hedged request holds a connection of the replica for the query session and, once
+    hedged, one of the backup database. This session only checks out a second replica
+    connection if the unhedged methods are used, so other queries, such as the
+    read-your-writes check, should run on the query session.
+    """
+
+    latencies: ClassVar[deque[float]] = deque(maxlen=1000)
+    hedge_delay: ClassVar[float] = utils_lib_settings.POSTGRES_HEDGE_DEFAULT_DELAY
+
+    def __init__(
+        self,
+        *args: Any,
+        backup: Callable[[], AbstractAsyncContextManager[AsyncSession]] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Initialize the hedged read session.
+
+        Args:
+            backup (Callable, optional): Factory of the backup session context manager.
+        """
+        super().__init__(*args, **kwargs)
+        self.query_session = AsyncSession(*args, **kwargs)
+        self.backup_factory = backup
+        self.backup: AsyncSession | None = None
+        self.use_backup = False
+        self.exit_stack = AsyncExitStack()
+        self.cancelled: dict[asyncio.Future[Any], AsyncSession] = {}
+
+    @classmethod
+    def observe(cls, seconds: float) -> None:
+        """
+        Record a query latency, recomputing the hedge delay every 100 queries.
+
+        Args:
+            seconds (float): The query latency.
+        """
+        cls.latencies.append(seconds)
+        if len(cls.latencies) >= 100 and len(cls.latencies) % 100 == 0:
+            ordered = sorted(cls.latencies)
+            index = int(
+                len(ordered) * utils_lib_settings.POSTGRES_HEDGE_PERCENTILE / 100
+            )
+            cls.hedge_delay = max(
+                ordered[min(index, len(ordered) - 1)],
+                utils_lib_settings.POSTGRES_HEDGE_MIN_DELAY,
+            )
+
+    @staticmethod
+    async def run(
+        session: AsyncSession, statement: Any, **kwargs: Any
+    ) -> FrozenResult[Any]:
+        """
+        Run a query on a session, detaching its result from the session.
+
+        Args:
+            session (AsyncSession): The session running the query.
+            statement (Any): The query.
+        Returns:
+            FrozenResult: The result, to merge into the session returning it.
+        """
+        result = await session.execute(statement, **kwargs)
+        frozen = result.freeze()
+        session.expunge_all()
+        return frozen
+
+    def merge_result(self, statement: Any, frozen: FrozenResult[Any]) -> Any:
+        """
+        Merge a query result into this session, without loading from the database.
+
+        Args:
+            statement (Any): The query.
+            frozen (FrozenResult): The result of the query on a query or backup session.
+        Returns:
+            Any: The result, in the form exec() returns it.
+        """
+        merged = merge_frozen_result(  # type: ignore[no-untyped-call]
+            self.sync_session, statement, frozen, load=False
+        )
+        result = merged()
+        return result.scalars() if isinstance(statement, SelectOfScalar) else result
+
+    async def exec(self, statement: Any, **kwargs: Any) -> Any:
+        if self.use_backup and self.backup:
+            frozen = await self.run(self.backup, statement, **kwargs)
+            return self.merge_result(statement, frozen)
+        if not self.backup_factory:
+            return await super().exec(statement, **kwargs)
+
+        # The query session is reused once the query it lost has been cancelled
+        await self.wait_cancelled()
+        start = time.perf_counter()
+        query = asyncio.ensure_future(self.run(self.query_session, statement, **kwargs))
+        done, _ = await asyncio.wait({query}, timeout=self.hedge_delay)
+        if done:
+            self.observe(time.perf_counter() - start)
+            return self.merge_result(statement, query.result())
+
+        if not self.backup:
+            self.backup = await self.exit_stack.enter_async_context(
+                self.backup_factory()
+            )
+        hedge = asyncio.ensure_future(self.run(self.backup, statement, **kwargs))
+        done, pending = await asyncio.wait(
+            {query, hedge}, return_when=asyncio.FIRST_COMPLETED
+        )
+        winner = done.pop()
+        # A failed query does not win while the other one may still succeed
+        if winner.exception() is not None and pending:
+            done, pending = await asyncio.wait(pending)
+            winner = done.pop()
+        # The loser is awaited before its session is used again or closed, not here
+        for task in pending:
+            task.cancel()
+            self.cancelled[task] = self.backup if task is hedge else self.query_session
+
+        self.observe(time.perf_counter() - start)
+        self.use_backup = winner is hedge
+        metrics.DB_HEDGED_READS_TOTAL.labels(
+            winner="hedge" if winner is hedge else "primary"
+        ).inc()
+        return self.merge_result(statement, winner.result())
+
+    async def wait_cancelled(self) -> None:
+        """
+        Wait for the cancelled queries to finish and invalidate their sessions.
+        """
+        if not self.cancelled:
+            return
+        await asyncio.gather(*self.cancelled, return_exceptions=True)
+        # The connection of a cancelled query is in an unknown state, it is discarded and
+        # the session reset, so it can run the next queries on a new connection
+        for session in self.cancelled.values():
+            await session.invalidate()
+        self.cancelled.clear()
+
+    async def close(self) -> None:
+        await self.wait_cancelled()
+        await self.query_session.close()
+        await self.exit_stack.aclose()
+        await super().close()
+
+
 class DatabaseSessionManager:
     def __init__(
         self,
@@ -20,15 +523,19 @@ class DatabaseSessionManager:
         pool_size: int = 10,
         max_overflow: int = 5,
         pool_timeout: int = 30,
+        query_cache_size: int = utils_lib_settings.POSTGRES_QUERY_CACHE_SIZE,
+        prepared_statement_cache_size: int = utils_lib_settings.POSTGRES_PREPARED_STATEMENT_CACHE_SIZE,
     ):
         self.database_url = database_url
         self.pool_size = pool_size
         self.max_overflow = max_overflow
         self.pool_timeout = pool_timeout
+        self.query_cache_size = query_cache_size
+        self.prepared_statement_cache_size = prepared_statement_cache_size
         self.engine: AsyncEngine | None = None
         self.session_maker: async_sessionmaker[AsyncSession] | None = None
-        self.read_engine: AsyncEngine | None = None
-        self.read_session_maker: async_sessionmaker[AsyncSession] | None = None
+        self.replicas: list[ReadReplica] = []
+        self.probe_task: asyncio.Task[None] | None = None
 
     async def create_database(self) -> None:
         """
@@ -63,6 +570,17 @@ class DatabaseSessionManager:
 
         await engine.dispose()
 
+    def get_connect_args(self) -> dict[str, Any]:
+        """
+        Gets the asyncpg connection arguments of the engines.
+
+        Returns:
+            dict[str, Any]: The connection arguments.
+        """
+        # Prepared statements are cached by the SQLAlchemy asyncpg adapter, keyed by the SQL
+        # string, so statements compiled once (see the CRUD modules) are also prepared once
+        return {"prepared_statement_cache_size": self.prepared_statement_cache_size}
+
     async def init_db(self) -> None:
         """
         Initializes the database connection.
@@ -74,7 +592,12 @@ class DatabaseSessionManager:
             pool_size=self.pool_size,
             max_overflow=self.max_overflow,
             pool_timeout=self.pool_timeout,
+            poolclass=TimedQueuePool,
+            pool_logging_name="primary",
+            query_cache_size=self.query_cache_size,
+            connect_args=self.get_connect_args(),
         )
+        instrument_engine(self.engine, "primary")
 
         self.session_maker = async_sessionmaker(
             bind=self.engine,
@@ -90,25 +613,59 @@ class DatabaseSessionManager:
 
         logger.info("Database initialized successfully.")
 
-        if utils_lib_settings.READ_DATABASE_URL:
-            self.read_engine = create_async_engine(
-                str(utils_lib_settings.READ_DATABASE_URL),
+        # A previous initialization may have left replicas behind (e.g. in tests)
+        self.replicas = []
+        for url in utils_lib_settings.READ_DATABASE_URLS:
+            host = str(url.hosts()[0]["host"])
+            engine = create_async_engine(
+                str(url),
                 pool_pre_ping=True,
                 echo=(utils_lib_settings.ENVIRONMENT == "local"),
                 pool_size=self.pool_size,
                 max_overflow=self.max_overflow,
                 pool_timeout=self.pool_timeout,
+                poolclass=TimedQueuePool,
+                pool_logging_name=f"read:{host}",
+                query_cache_size=self.query_cache_size,
+                connect_args=self.get_connect_args(),
             )
+            instrument_engine(engine, f"read:{host}")
+            self.replicas.append(ReadReplica(host, engine))
 
-            self.read_session_maker = async_sessionmaker(
-                bind=self.read_engine,
-                expire_on_commit=False,
-                autocommit=False,
-                autoflush=False,
-                class_=AsyncSession,
+        if self.replicas:
+            self.probe_task = asyncio.create_task(self.probe_replicas())
+            logger.info(
+                f"{len(self.replicas)} read database(s) detected and initialized successfully."
             )
 
-            logger.info("Read database detected and initialized successfully.")
+    async def probe_replicas(self) -> None:
+        """
+        Periodically checks the health and replication lag of the read replicas.
+        """
+        while True:
+            await asyncio.gather(*(replica.probe() for replica in self.replicas))
+            await asyncio.sleep(utils_lib_settings.POSTGRES_READ_PROBE_INTERVAL)
+
+    def get_replica(self, exclude: ReadReplica | None = None) -> ReadReplica | None:
+        """
+        Gets the healthy read replica with the fewest outstanding sessions.
+
+        Args:
+            exclude (ReadReplica, optional): A replica not to return.
+        Returns:
+            ReadReplica | None: The replica, or None if no replica is healthy.
+        """
+        healthy = [
+            replica
+            for replica in self.replicas
+            if replica.healthy and replica is not exclude
+        ]
+        if not healthy:
+            return None
+        fewest = min(replica.outstanding for replica in healthy)
+        return random.choice(
+            [replica for replica in healthy if replica.outstanding == fewest]
+        )
 
     @asynccontextmanager
     async def get_session(
@@ -122,8 +679,9 @@ class DatabaseSessionManager:
         Yields:
             AsyncSession: The database session.
         """
-        if read_only and self.read_session_maker:
-            async with self.read_session_maker() as session:
+        replica = self.get_replica() if read_only else None
+        if replica:
+            async with replica.get_session() as session:
                 yield session
         elif self.session_maker:
             async with self.session_maker() as session:
@@ -131,10 +689,81 @@ class DatabaseSessionManager:
         else:
             raise Exception("Session maker not initialized")
 
+    @asynccontextmanager
+    async def get_hedged_session(
+        self, replica: ReadReplica
+    ) -> AsyncGenerator[HedgedReadSession, None]:
+        """
+        Gets a hedged read session of a replica, backed by another replica or the primary.
+
+        Args:
+            replica (ReadReplica): The replica serving the queries.
+        Yields:
+            HedgedReadSession: The hedged read session.
+        """
+
+        def get_backup() -> AbstractAsyncContextManager[AsyncSession]:
+            backup = self.get_replica(exclude=replica)
+            if backup:
+                return backup.get_session()
+            return self.get_session()
+
+        replica.outstanding += 1
+        try:
+            async with HedgedReadSession(
+                bind=replica.engine,
+                expire_on_commit=False,
+                autoflush=False,
+                backup=get_backup,
+            ) as session:
+                yield session
+        finally:
+            replica.outstanding -= 1
+
+    async def get_write_lsn(self, session: AsyncSession) -> str:
+        """
+        Gets the current WAL position of the primary, covering the writes committed so far.
+
+        Args:
+            session (AsyncSession): A session of the primary database.
+        Returns:
+            str: The WAL LSN.
+        """
+        result = await session.execute(text("SELECT pg_current_wal_lsn()::text"))
+        return str(result.scalar_one())
+
+    async def has_replayed(self, session: AsyncSession, lsn: str) -> bool:
+        """
+        Checks whether a replica has replayed the WAL up to a position.
+
+        Args:
+            session (AsyncSession): A session of the replica.
+            lsn (str): The WAL LSN to check.
+        Returns:
+            bool: True if the replica has replayed the LSN, or is not in recovery.
+        """
+        # The position is sent as text, asyncpg only encodes pg_lsn parameters from integers
+        result = await session.execute(
+            text(
+                "SELECT COALESCE(pg_last_wal_replay_lsn() >= "
+                "CAST(CAST(:lsn AS text) AS pg_lsn), true)"
+            ),
+            params={"lsn": lsn},
+        )
+        return bool(result.scalar_one())
+
     async def close(self) -> None:
         """
         Closes the database connection.
         """
+        if self.probe_task:
+            self.probe_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self.probe_task
+            self.probe_task = None
+        for replica in self.replicas:
+            await replica.engine.dispose()
+        self.replicas = []
         if self.engine:
             await self.engine.dispose()
             logger.info("Database connection closed.")
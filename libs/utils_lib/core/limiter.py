@@ -1,11 +1,26 @@
+import asyncio
 import logging
+import math
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import AsyncGenerator
+from typing import Literal
 
 from fastapi import HTTPException, Request
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from redis.commands.core import AsyncScript
+from starlette.routing import BaseRoute
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from libs.auth_lib.utils import get_user_id_from_request
 from libs.utils_lib.core.config import settings as utils_lib_settings
+from libs.utils_lib.core.prometheus import metrics
 from libs.utils_lib.core.redis import RedisClient
-from libs.utils_lib.core.security import get_client_ip
+from libs.utils_lib.core.routing import RouteResolver
+from libs.utils_lib.core.security import get_client_ip, security_settings
+from libs.utils_lib.core.timing import timed
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -13,32 +28,480 @@ logger = logging.getLogger(__name__)
 
 TIME_EQUIVALENT_IN_SECONDS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
 
+LimiterAlgorithm = Literal[
+    "fixed_window", "sliding_window_log", "sliding_window_counter", "gcra"
+]
+LimiterStorage = Literal["keys", "hash"]
+
+# Lua scripts checking every window of a rule set in a single round trip.
+# KEYS[i] holds the state of window i, ARGV[2i-1] its limit and ARGV[2i] its length
+# in milliseconds, followed by a unique request nonce, the number of hits to check and
+# the number of hits already admitted by the local tier, which are recorded either way.
+# Each script returns {index, retry_after_ms} where index is the 1-based window that
+# tripped, or 0 if the hits are allowed. The Redis server clock is used so all pods
+# agree on time.
+REDIS_LUA_NOW = """
+local time = redis.call("TIME")
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local nonce = ARGV[#KEYS * 2 + 1]
+local cost = tonumber(ARGV[#KEYS * 2 + 2])
+local admitted = tonumber(ARGV[#KEYS * 2 + 3])
+"""
+
+REDIS_LUA_SCRIPTS: dict[LimiterAlgorithm, str] = {
+    # Fixed window counter (INCR + PEXPIRE), retry after the window resets
+    "fixed_window": REDIS_LUA_NOW
+    + """
+local tripped, retry_after = 0, 0
+for i, key in ipairs(KEYS) do
+    local current = (tonumber(redis.call("GET", key)) or 0) + admitted
+    if tripped == 0 and current + cost > tonumber(ARGV[i * 2 - 1]) then
+        local ttl = redis.call("PTTL", key)
+        if ttl < 0 then
+            ttl = tonumber(ARGV[i * 2])
+        end
+        tripped, retry_after = i, ttl
+    end
+end
+-- Denied hits are not counted, the admitted ones always are
+local charged = tripped == 0 and cost or 0
+if charged + admitted > 0 then
+    for i, key in ipairs(KEYS) do
+        redis.call("INCRBY", key, admitted + charged)
+        if redis.call("PTTL", key) < 0 then
+            redis.call("PEXPIRE", key, ARGV[i * 2])
+        end
+    end
+end
+return {tripped, retry_after}
+""",
+    # Sliding window log (sorted set of timestamps), retry after enough entries expire
+    "sliding_window_log": REDIS_LUA_NOW
+    + """
+for i, key in ipairs(KEYS) do
+    redis.call("ZREMRANGEBYSCORE", key, "-inf", now - tonumber(ARGV[i * 2]))
+    if admitted > 0 then
+        for hit = 1, admitted do
+            redis.call("ZADD", key, now, nonce .. ":admitted:" .. hit)
+        end
+        redis.call("PEXPIRE", key, ARGV[i * 2])
+    end
+end
+for i, key in ipairs(KEYS) do
+    local limit = tonumber(ARGV[i * 2 - 1])
+    local window = tonumber(ARGV[i * 2])
+    local count = redis.call("ZCARD", key)
+    if count + cost > limit then
+        if cost > limit then
+            return {i, window}
+        end
+        local index = count + cost - limit - 1
+        local entry = redis.call("ZRANGE", key, index, index, "WITHSCORES")
+        return {i, math.max(1, tonumber(entry[2]) + window - now)}
+    end
+end
+for i, key in ipairs(KEYS) do
+    for hit = 1, cost do
+        redis.call("ZADD", key, now, nonce .. ":" .. hit)
+    end
+    redis.call("PEXPIRE", key, ARGV[i * 2])
+end
+return {0, 0}
+""",
+    # Sliding window counter (current and previous bucket weighted by overlap)
+    "sliding_window_counter": REDIS_LUA_NOW
+    + """
+local states = {}
+local tripped, retry_after = 0, 0
+for i, key in ipairs(KEYS) do
+    local limit = tonumber(ARGV[i * 2 - 1])
+    local window = tonumber(ARGV[i * 2])
+    local bucket = math.floor(now / window)
+    local state = redis.call("HMGET", key, "b", "c", "p")
+    local last = tonumber(state[1])
+    local current = tonumber(state[2]) or 0
+    local previous = tonumber(state[3]) or 0
+    if last == nil or last < bucket - 1 then
+        current, previous = 0, 0
+    elseif last == bucket - 1 then
+        current, previous = 0, current
+    end
+    current = current + admitted
+    local elapsed = now - bucket * window
+    if tripped == 0 and previous * (window - elapsed) / window + current + cost > limit then
+        local retry
+        local room = math.max(0, limit - cost)
+        if current <= room then
+            retry = window - elapsed - (room - current) * window / previous
+        else
+            retry = window - elapsed + math.max(0, window - room * window / current)
+        end
+        tripped, retry_after = i, math.max(1, math.ceil(retry))
+    end
+    states[i] = {bucket, current, previous, window}
+end
+-- Denied hits are not counted, the admitted ones always are
+local charged = tripped == 0 and cost or 0
+if charged + admitted > 0 then
+    for i, key in ipairs(KEYS) do
+        local state = states[i]
+        redis.call("HSET", key, "b", state[1], "c", state[2] + charged, "p", state[3])
+        redis.call("PEXPIRE", key, state[4] * 2)
+    end
+end
+return {tripped, retry_after}
+""",
+    # Generic cell rate algorithm (theoretical arrival time), retry when conforming
+    "gcra": REDIS_LUA_NOW
+    + """
+local tats = {}
+local tripped, retry_after = 0, 0
+for i, key in ipairs(KEYS) do
+    local window = tonumber(ARGV[i * 2])
+    local emission = window / tonumber(ARGV[i * 2 - 1])
+    local tat = tonumber(redis.call("GET", key)) or now
+    if tat < now then
+        tat = now
+    end
+    tat = tat + emission * admitted
+    local allow_at = tat + emission * cost - window
+    if tripped == 0 and allow_at > now then
+        tripped, retry_after = i, math.max(1, math.ceil(allow_at - now))
+    end
+    tats[i] = {tat, emission}
+end
+-- Denied hits are not counted, the admitted ones always are
+local charged = tripped == 0 and cost or 0
+if charged + admitted > 0 then
+    for i, key in ipairs(KEYS) do
+        local tat = tats[i][1] + tats[i][2] * charged
+        redis.call("SET", key, tostring(tat), "PX", math.max(1, math.ceil(tat - now)))
+    end
+end
+return {tripped, retry_after}
+""",
+}
+
+# Lua scripts for the compact storage layout: KEYS[1] is a single hash per identity and
+# ARGV holds the limits and window lengths, the request nonce, cost and admitted hits,
+# then the hash field of each window. Field values carry their own expiry, and the hash
+# expires with the longest window still in use (Redis has no field-level expiry before
+# 7.4).
+REDIS_LUA_HASH_PREAMBLE = """
+local time = redis.call("TIME")
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local n = (#ARGV - 3) / 3
+local cost = tonumber(ARGV[n * 2 + 2])
+local admitted = tonumber(ARGV[n * 2 + 3])
+local ttl = 0
+local function extend()
+    if redis.call("PTTL", KEYS[1]) < ttl then
+        redis.call("PEXPIRE", KEYS[1], ttl)
+    end
+end
+"""
+
+REDIS_LUA_HASH_SCRIPTS: dict[LimiterAlgorithm, str] = {
+    # Fixed window counter stored as "count:expires_at_ms"
+    "fixed_window": REDIS_LUA_HASH_PREAMBLE
+    + """
+local states = {}
+local tripped, retry_after = 0, 0
+for i = 1, n do
+    local window = tonumber(ARGV[i * 2])
+    local count, expires = 0, now + window
+    local value = redis.call("HGET", KEYS[1], ARGV[n * 2 + 3 + i])
+    if value then
+        local stored, stored_expires = string.match(value, "(%d+):(%d+)")
+        if tonumber(stored_expires) > now then
+            count, expires = tonumber(stored), tonumber(stored_expires)
+        end
+    end
+    count = count + admitted
+    if tripped == 0 and count + cost > tonumber(ARGV[i * 2 - 1]) then
+        tripped, retry_after = i, expires - now
+    end
+    states[i] = {count, expires}
+end
+-- Denied hits are not counted, the admitted ones always are
+local charged = tripped == 0 and cost or 0
+if charged + admitted > 0 then
+    for i = 1, n do
+        local state = states[i]
+        redis.call(
+            "HSET", KEYS[1], ARGV[n * 2 + 3 + i], (state[1] + charged) .. ":" .. state[2]
+        )
+        ttl = math.max(ttl, state[2] - now)
+    end
+    extend()
+end
+return {tripped, retry_after}
+""",
+    # Sliding window counter stored as "bucket:current:previous"
+    "sliding_window_counter": REDIS_LUA_HASH_PREAMBLE
+    + """
+local states = {}
+local tripped, retry_after = 0, 0
+for i = 1, n do
+    local limit = tonumber(ARGV[i * 2 - 1])
+    local window = tonumber(ARGV[i * 2])
+    local bucket = math.floor(now / window)
+    local current, previous = 0, 0
+    local value = redis.call("HGET", KEYS[1], ARGV[n * 2 + 3 + i])
+    if value then
+        local last, stored, stored_previous = string.match(value, "(%d+):(%d+):(%d+)")
+        last = tonumber(last)
+        if last == bucket then
+            current, previous = tonumber(stored), tonumber(stored_previous)
+        elseif last == bucket - 1 then
+            previous = tonumber(stored)
+        end
+    end
+    current = current + admitted
+    local elapsed = now - bucket * window
+    if tripped == 0 and previous * (window - elapsed) / window + current + cost > limit then
+        local retry
+        local room = math.max(0, limit - cost)
+        if current <= room then
+            retry = window - elapsed - (room - current) * window / previous
+        else
+            retry = window - elapsed + math.max(0, window - room * window / current)
+        end
+        tripped, retry_after = i, math.max(1, math.ceil(retry))
+    end
+    states[i] = {bucket, current, previous}
+    ttl = math.max(ttl, (bucket + 2) * window - now)
+end
+-- Denied hits are not counted, the admitted ones always are
+local charged = tripped == 0 and cost or 0
+if charged + admitted > 0 then
+    for i = 1, n do
+        local state = states[i]
+        redis.call(
+            "HSET", KEYS[1], ARGV[n * 2 + 3 + i],
+            state[1] .. ":" .. (state[2] + charged) .. ":" .. state[3]
+        )
+    end
+    extend()
+end
+return {tripped, retry_after}
+""",
+    # Generic cell rate algorithm storing the theoretical arrival time
+    "gcra": REDIS_LUA_HASH_PREAMBLE
+    + """
+local tats = {}
+local tripped, retry_after = 0, 0
+for i = 1, n do
+    local window = tonumber(ARGV[i * 2])
+    local emission = window / tonumber(ARGV[i * 2 - 1])
+    local tat = tonumber(redis.call("HGET", KEYS[1], ARGV[n * 2 + 3 + i])) or now
+    if tat < now then
+        tat = now
+    end
+    tat = tat + emission * admitted
+    local allow_at = tat + emission * cost - window
+    if tripped == 0 and allow_at > now then
+        tripped, retry_after = i, math.max(1, math.ceil(allow_at - now))
+    end
+    tats[i] = {tat, emission}
+end
+-- Denied hits are not counted, the admitted ones always are
+local charged = tripped == 0 and cost or 0
+if charged + admitted > 0 then
+    for i = 1, n do
+        local tat = tats[i][1] + tats[i][2] * charged
+        redis.call("HSET", KEYS[1], ARGV[n * 2 + 3 + i], tostring(tat))
+        ttl = math.max(ttl, math.ceil(tat - now))
+    end
+    extend()
+end
+return {tripped, retry_after}
+""",
+}
+
+
+# Lua script acquiring a concurrency lease: KEYS[1] is a sorted set of lease IDs scored
+# by their expiry, ARGV holds the limit, the lease length in milliseconds and the lease ID.
+# Returns 1 if the lease was acquired, 0 if the limit is reached.
+REDIS_LUA_ACQUIRE_LEASE = """
+local time = redis.call("TIME")
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+redis.call("ZREMRANGEBYSCORE", KEYS[1], "-inf", now)
+if redis.call("ZCARD", KEYS[1]) >= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call("ZADD", KEYS[1], now + tonumber(ARGV[2]), ARGV[3])
+redis.call("PEXPIRE", KEYS[1], ARGV[2])
+return 1
+"""
+
+
+class CircuitBreaker:
+    """
+    A circuit breaker guarding calls to a dependency.
+
+    The circuit opens after a number of consecutive failures. Once the reset timeout has
+    passed, a single probe call is let through (half open): success closes the circuit,
+    failure opens it again.
+    """
+
+    STATES = {"closed": 0, "open": 1, "half_open": 2}
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float) -> None:
+        """
+        Initialize the circuit breaker.
+
+        Args:
+            name (str): The name of the breaker, used as metric label.
+            failure_threshold (int): Consecutive failures that open the circuit.
+            reset_timeout (float): Seconds the circuit stays open before a probe is allowed.
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.set_state("closed")
+
+    def set_state(self, state: str) -> None:
+        """
+        Change the state of the circuit and export it.
+
+        Args:
+            state (str): The new state, one of "closed", "open" or "half_open".
+        """
+        self.state = state
+        metrics.RATE_LIMIT_CIRCUIT_BREAKER_STATE.labels(breaker=self.name).set(
+            self.STATES[state]
+        )
+
+    def allow_request(self) -> bool:
+        """
+        Check whether a call to the dependency may be attempted.
+
+        Returns:
+            bool: True if the call should be attempted.
+        """
+        if self.state == "closed":
+            return True
+        if (
+            self.state == "open"
+            and time.monotonic() - self.opened_at >= self.reset_timeout
+        ):
+            self.set_state("half_open")
+            self.probing = False
+        if self.state == "half_open" and not self.probing:
+            self.probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        """
+        Record a successful call, closing the circuit.
+        """
+        self.failures = 0
+        if self.state != "closed":
+            logger.info(f"Circuit breaker {self.name} closed.")
+            self.set_state("closed")
+
+    def record_failure(self) -> None:
+        """
+        Record a failed or slow call, opening the circuit when the threshold is reached.
+        """
+        self.failures += 1
+        if self.state == "half_open" or (
+            self.state == "closed" and self.failures >= self.failure_threshold
+        ):
+            logger.warning(f"Circuit breaker {self.name} opened.")
+            self.opened_at = time.monotonic()
+            self.set_state("open")
+
+
+class LocalLimitState:
+    """
+    In-process rate limit state of a single identity.
+
+    Attributes:
+        blocked_until (float): Monotonic time until which Redis reported the identity over its limit.
+        blocked_window (int): Index of the rule that blocked the identity.
+        tokens (int): Hits that may still be admitted locally before the next Redis sync.
+        pending (int): Hits admitted locally that have not been recorded in Redis yet.
+        synced_at (float): Monotonic time of the last Redis sync.
+        windows (list): Start and hit count of each fixed window used while Redis is unavailable.
+        endpoint (str): The route template or bucket the state is counted under.
+    """
+
+    __slots__ = (
+        "blocked_until",
+        "blocked_window",
+        "tokens",
+        "pending",
+        "synced_at",
+        "windows",
+        "endpoint",
+    )
+
+    def __init__(self, endpoint: str) -> None:
+        self.blocked_until = 0.0
+        self.blocked_window = 0
+        self.tokens = 0
+        self.pending = 0
+        self.synced_at = 0.0
+        self.windows: list[list[float]] = []
+        self.endpoint = endpoint
+
 
 class Limiter:
     """
-    A rate limiter class that uses Redis to limit the number of requests
+    A rate limiter class that uses Redis to limit the number of requests.
+
+    A local tier sits in front of Redis: identities Redis has reported over their limit are
+    rejected in-process until their retry time, and with RATE_LIMIT_LOCAL_ERROR_BOUND set,
+    up to that share of the tightest limit is admitted locally per pod and reconciled into
+    Redis with the next check once exhausted or after RATE_LIMIT_LOCAL_SYNC_INTERVAL.
+
+    Redis checks are bounded by RATE_LIMIT_REDIS_TIMEOUT and guarded by a circuit breaker;
+    while Redis is unavailable the rules are enforced per pod with in-memory fixed windows.
     """
 
     redis_client: RedisClient
     enable_limiter: bool = True
+    scripts: dict[tuple[LimiterAlgorithm, LimiterStorage], AsyncScript] = {}
+    breaker = CircuitBreaker(
+        "redis",
+        failure_threshold=security_settings.RATE_LIMIT_BREAKER_FAILURE_THRESHOLD,
+        reset_timeout=security_settings.RATE_LIMIT_BREAKER_RESET_TIMEOUT,
+    )
 
-    def __init__(self, rules: str) -> None:
+    def __init__(
+        self,
+        rules: str,
+        algorithm: LimiterAlgorithm = "fixed_window",
+        bucket: str | None = None,
+        cost: int = 1,
+    ) -> None:
         """
         Initialize the rate limiter with rules.
 
         Args:
             rules (str): A comma-separated string of rate limit rules in the format "count/unit".
                          Example: "10/second, 100/minute, 1000/hour".
+            algorithm (LimiterAlgorithm, optional): The rate limiting algorithm, one of
+                "fixed_window", "sliding_window_log", "sliding_window_counter" or "gcra".
+                Defaults to "fixed_window".
+            bucket (str, optional): Name of a budget shared by every request using it, instead
+                of one budget per route. Defaults to None.
+            cost (int, optional): Units charged against the rules per request. Defaults to 1.
         """
+        if algorithm not in REDIS_LUA_SCRIPTS:
+            raise ValueError(f"Unknown rate limiting algorithm: {algorithm}")
+        if cost < 1:
+            raise ValueError("Rate limit cost must be at least 1")
+        self.algorithm = algorithm
+        self.bucket = bucket
+        self.cost = cost
         self.rules = []
-        # Use Lua script for atomic increment and expiry
-        self.REDIS_LUA_INCREMENT = """
-        local current = redis.call("INCR", KEYS[1])
-        if tonumber(current) == 1 then
-            redis.call("EXPIRE", KEYS[1], ARGV[1])
-        end
-        return current
-        """
         for rule in rules.split(","):
             rule = rule.strip()
             if not rule:
@@ -47,13 +510,47 @@ class Limiter:
             self.rules.append(
                 (int(count), unit.strip(), TIME_EQUIVALENT_IN_SECONDS[unit.strip()])
             )
+        self.windows = [f"{count}/{unit}" for count, unit, _ in self.rules]
+        # Limits and window lengths are static, so the script arguments are built once
+        self.script_args = [
+            value for count, _, expiry in self.rules for value in (count, expiry * 1000)
+        ]
+        # Each algorithm stores a different data type, so keep their keys apart
+        self.key_suffix = "" if algorithm == "fixed_window" else f":{algorithm}"
+        # Sliding window logs need a sorted set per window, so they always use keys
+        self.storage: LimiterStorage = (
+            security_settings.RATE_LIMIT_STORAGE
+            if algorithm in REDIS_LUA_HASH_SCRIPTS
+            else "keys"
+        )
+        self.local_states: OrderedDict[str, LocalLimitState] = OrderedDict()
+        self.local_budget = int(
+            min((count for count, _, _ in self.rules), default=0)
+            * security_settings.RATE_LIMIT_LOCAL_ERROR_BOUND
+        )
 
     async def __call__(self, request: Request) -> None:
+        """
+        Check if the request exceeds the rate limit as a route dependency.
+
+        Limiters already enforced by LimiterMiddleware for this request are skipped.
+
+        Args:
+            request (Request): The incoming HTTP request.
+        """
+        if self in getattr(request.state, "checked_limiters", ()):
+            return None
+        with timed("limiter"):
+            await self.check(request)
+
+    async def check(self, request: Request) -> None:
         """
         Check if the request exceeds the rate limit.
 
         Args:
             request (Request): The incoming HTTP request.
+        Raises:
+            HTTPException: 429 with a Retry-After header if the request is over the limit.
         """
         if not self.enable_limiter:
             return None
@@ -64,34 +561,182 @@ class Limiter:
             logger.info("Bypassing rate limit for request.")
             return None
 
+        identity, target = await get_request_identity(request, self.bucket)
+        identifier_base = f"LIMITER:{identity}:{target}"
+        endpoint = self.bucket or request.scope["route"].path
+        state = self.get_local_state(identifier_base, endpoint)
+        now = time.monotonic()
+
+        # Identities already over their limit are rejected without touching Redis
+        if state.blocked_until > now:
+            self.reject(
+                endpoint, state.blocked_window, "local", state.blocked_until - now
+            )
+        # Spend the local budget until it is exhausted or due for reconciliation
+        if (
+            state.tokens >= self.cost
+            and now - state.synced_at < security_settings.RATE_LIMIT_LOCAL_SYNC_INTERVAL
+        ):
+            state.tokens -= self.cost
+            state.pending += self.cost
+            return self.allow(endpoint, "local")
+
+        if not self.breaker.allow_request():
+            return self.check_local(endpoint, state, now)
+
         try:
             redis = self.redis_client.get_client()
         except Exception:
             logger.warning("Redis client is not initialized or connected.")
-            return None
+            self.breaker.record_failure()
+            return self.check_local(endpoint, state, now)
 
-        identifier_base = await self.get_identifier(request)
+        # Record the locally admitted hits, whether this request is allowed or not
+        keys, args = self.get_script_call(identity, target, self.cost, state.pending)
 
-        for count, unit, expiry in self.rules:
-            key = f"{identifier_base}:{unit}"
-            try:
-                current_count = await redis.eval(
-                    self.REDIS_LUA_INCREMENT, 1, key, str(expiry)
-                )  # type: ignore
-
-                if int(current_count) > count:
-                    raise HTTPException(
-                        status_code=429,
-                        detail="Too Many Requests",
-                        headers={"Retry-After": str(expiry)},
-                    )
+        start_time = time.perf_counter()
+        try:
+            script = self.get_script(self.algorithm, self.storage)
+            tripped, retry_after_ms = await asyncio.wait_for(
+                script(keys=keys, args=args, client=redis),
+                timeout=security_settings.RATE_LIMIT_REDIS_TIMEOUT,
+            )
+        except Exception as e:
+            logger.warning(f"Rate limit check failed for {identifier_base}: {e!r}")
+            self.breaker.record_failure()
+            return self.check_local(endpoint, state, now)
+        finally:
+            metrics.RATE_LIMIT_REDIS_LATENCY.labels(algorithm=self.algorithm).observe(
+                time.perf_counter() - start_time
+            )
 
-            except HTTPException:
-                raise
-            except Exception as e:
-                logger.warning(f"Rate limit check failed for {key}: {e}")
+        self.breaker.record_success()
+        state.pending = 0
+        state.synced_at = now
+        tripped = int(tripped)
+        if tripped:
+            state.tokens = 0
+            state.blocked_until = now + int(retry_after_ms) / 1000
+            state.blocked_window = tripped - 1
+            self.reject(endpoint, tripped - 1, "redis", int(retry_after_ms) / 1000)
+        state.tokens = self.local_budget
+
+        return self.allow(endpoint, "redis")
+
+    def get_script_call(
+        self, identity: str, target: str, cost: int, admitted: int = 0
+    ) -> tuple[list[str], list[str | int]]:
+        """
+        Build the keys and arguments of the limiter script for the configured storage layout.
+
+        Args:
+            identity (str): The user ID or client IP of the request.
+            target (str): The method and route template, or the bucket name.
+            cost (int): Units to check and charge against the rules.
+            admitted (int, optional): Units already admitted by the local tier, recorded
+                even if the request is rejected. Defaults to 0.
+        Returns:
+            tuple[list[str], list[str | int]]: The script keys and arguments.
+        """
+        args: list[str | int] = [*self.script_args, uuid.uuid4().hex, cost, admitted]
+        if self.storage == "hash":
+            fields = [f"{target}:{unit}{self.key_suffix}" for _, unit, _ in self.rules]
+            return [f"LIMITER:{identity}"], [*args, *fields]
+        keys = [
+            f"LIMITER:{identity}:{target}:{unit}{self.key_suffix}"
+            for _, unit, _ in self.rules
+        ]
+        return keys, args
+
+    def check_local(self, endpoint: str, state: LocalLimitState, now: float) -> None:
+        """
+        Enforce the rules with in-memory fixed windows while Redis is unavailable.
+
+        Args:
+            endpoint (str): The route template of the request.
+            state (LocalLimitState): The local state of the identity.
+            now (float): The current monotonic time.
+        """
+        if not state.windows:
+            state.windows = [[now, 0] for _ in self.rules]
+
+        tripped, retry_after = -1, 0.0
+        for index, (window, (count, _, expiry)) in enumerate(
+            zip(state.windows, self.rules, strict=True)
+        ):
+            if now - window[0] >= expiry:
+                window[0], window[1] = now, 0
+            window[1] += self.cost
+            if window[1] > count and window[0] + expiry - now > retry_after:
+                tripped, retry_after = index, window[0] + expiry - now
+
+        if tripped >= 0:
+            self.reject(endpoint, tripped, "fallback", retry_after)
+        return self.allow(endpoint, "fallback")
+
+    @staticmethod
+    def allow(endpoint: str, source: str) -> None:
+        """
+        Record an allowed request.
+
+        Args:
+            endpoint (str): The route template of the request.
+            source (str): The tier that allowed the request ("redis", "local" or "fallback").
+        """
+        metrics.RATE_LIMIT_DECISIONS_TOTAL.labels(
+            endpoint=endpoint, window="", decision="allowed", source=source
+        ).inc()
 
-        return None
+    def reject(
+        self, endpoint: str, window: int, source: str, retry_after: float
+    ) -> None:
+        """
+        Record a rejected request and raise a 429 response telling the client how long to back off.
+
+        Args:
+            endpoint (str): The route template of the request.
+            window (int): Index of the rule that tripped.
+            source (str): The tier that rejected the request ("redis", "local" or "fallback").
+            retry_after (float): Seconds until the request would be allowed.
+        """
+        metrics.RATE_LIMIT_DECISIONS_TOTAL.labels(
+            endpoint=endpoint,
+            window=self.windows[window],
+            decision="rejected",
+            source=source,
+        ).inc()
+        # Round up so clients never retry before the window actually allows it
+        raise HTTPException(
+            status_code=429,
+            detail="Too Many Requests",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+    def get_local_state(self, identifier: str, endpoint: str) -> LocalLimitState:
+        """
+        Get the local state of an identity, evicting the least recently used one when full.
+
+        The tracked identities gauge is updated as states are added and evicted, so the
+        limiters sharing an endpoint or bucket add up instead of overwriting each other.
+
+        Args:
+            identifier (str): The rate limit identifier of the request.
+            endpoint (str): The route template of the request, or the bucket name.
+        Returns:
+            LocalLimitState: The local state of the identity.
+        """
+        state = self.local_states.get(identifier)
+        if state is None:
+            state = self.local_states[identifier] = LocalLimitState(endpoint)
+            metrics.RATE_LIMIT_TRACKED_IDENTITIES.labels(endpoint=endpoint).inc()
+            if len(self.local_states) > security_settings.RATE_LIMIT_LOCAL_MAX_KEYS:
+                _, evicted = self.local_states.popitem(last=False)
+                metrics.RATE_LIMIT_TRACKED_IDENTITIES.labels(
+                    endpoint=evicted.endpoint
+                ).dec()
+        else:
+            self.local_states.move_to_end(identifier)
+        return state
 
     @classmethod
     def init(
@@ -106,6 +751,38 @@ class Limiter:
         """
         cls.redis_client = redis_client
         cls.enable_limiter = enable_limiter if enable_limiter is not None else True
+        cls.scripts = {}
+        try:
+            for algorithm in REDIS_LUA_SCRIPTS:
+                cls.get_script(algorithm, "keys")
+            for algorithm in REDIS_LUA_HASH_SCRIPTS:
+                cls.get_script(algorithm, "hash")
+        except Exception:
+            logger.warning("Redis client is not connected, limiter scripts not loaded.")
+
+    @classmethod
+    def get_script(
+        cls, algorithm: LimiterAlgorithm, storage: LimiterStorage = "keys"
+    ) -> AsyncScript:
+        """
+        Get the registered script for an algorithm, registering it on first use.
+
+        The script is executed with EVALSHA and is re-loaded automatically if Redis
+        responds with NOSCRIPT (e.g. after a restart or failover).
+
+        Args:
+            algorithm (LimiterAlgorithm): The rate limiting algorithm.
+            storage (LimiterStorage, optional): The storage layout. Defaults to "keys".
+        Returns:
+            AsyncScript: The registered script.
+        """
+        if (algorithm, storage) not in cls.scripts:
+            redis = cls.redis_client.get_client()
+            source = (
+                REDIS_LUA_HASH_SCRIPTS if storage == "hash" else REDIS_LUA_SCRIPTS
+            )[algorithm]
+            cls.scripts[(algorithm, storage)] = redis.register_script(source)
+        return cls.scripts[(algorithm, storage)]
 
     async def get_identifier(self, request: Request) -> str:
         """
@@ -116,12 +793,267 @@ class Limiter:
         Returns:
             str: A unique identifier for the request.
         """
-        # Try to get path from route
+        return await get_request_identifier(request, self.bucket)
+
+
+async def get_request_identifier(request: Request, bucket: str | None = None) -> str:
+    """
+    Generate a unique identifier for the request based on the client's identity and request path.
+
+    Args:
+        request (Request): The incoming HTTP request.
+        bucket (str, optional): Name of a budget shared across routes, used instead of the path.
+    Returns:
+        str: A unique identifier for the request.
+    """
+    identity, target = await get_request_identity(request, bucket)
+    return f"LIMITER:{identity}:{target}"
+
+
+async def get_request_identity(
+    request: Request, bucket: str | None = None
+) -> tuple[str, str]:
+    """
+    Resolve who sent the request and which budget it is charged against.
+
+    Args:
+        request (Request): The incoming HTTP request.
+        bucket (str, optional): Name of a budget shared across routes, used instead of the path.
+    Returns:
+        tuple[str, str]: The user ID or client IP, and the method and route path or bucket.
+    """
+    # Budgets shared by name are charged as is, others per method and route path
+    if bucket:
+        target = bucket
+    else:
         route = request.scope.get("route")
-        if not route or not getattr(route, "path", None):
+        if route is None or not getattr(route, "path", None):
             logger.error("Failed to resolve request path for rate limiting.")
             raise HTTPException(status_code=500, detail="Internal routing error.")
-        # Prefer user ID from token if available
-        user_id = await get_user_id_from_request(request)
-        identity = str(user_id) if user_id else get_client_ip(request)
-        return f"LIMITER:{identity}:{request.method}:{route.path}"
+        target = f"{request.method}:{route.path}"
+    # Prefer user ID from token if available
+    user_id = await get_user_id_from_request(request)
+    identity = str(user_id) if user_id else get_client_ip(request)
+    return identity, target
+
+
+class ConcurrencyLimiter:
+    """
+    A Redis-backed semaphore capping the in-flight requests of an identity.
+
+    Each admitted request holds a lease in a sorted set scored by its expiry, so leases of
+    a crashed pod are dropped after RATE_LIMIT_CONCURRENCY_LEASE seconds. The limiter is a
+    yield dependency releasing the lease once the route has finished.
+    """
+
+    script: AsyncScript | None = None
+
+    def __init__(self, limit: int, bucket: str | None = None) -> None:
+        """
+        Initialize the concurrency limiter.
+
+        Args:
+            limit (int): Maximum number of simultaneous requests per identity.
+            bucket (str, optional): Name of a cap shared by every route using it, instead of
+                one cap per route. Defaults to None.
+        """
+        self.limit = limit
+        self.bucket = bucket
+        self.lease_ms = int(security_settings.RATE_LIMIT_CONCURRENCY_LEASE * 1000)
+
+    async def __call__(self, request: Request) -> AsyncGenerator[None, None]:
+        """
+        Acquire a lease for the request and release it after the response is produced.
+
+        Args:
+            request (Request): The incoming HTTP request.
+        Raises:
+            HTTPException: 429 if the identity already has the maximum requests in flight.
+        """
+        # Bypass rate limiter with header for local or staging environments
+        if not Limiter.enable_limiter or (
+            request.headers.get("X-Bypass-RateLimit")
+            and utils_lib_settings.ENVIRONMENT in ["local", "staging"]
+        ):
+            yield
+            return
+
+        key = f"{await get_request_identifier(request, self.bucket)}:inflight"
+        endpoint = self.bucket or request.scope["route"].path
+        lease_id = uuid.uuid4().hex
+
+        acquired = None
+        if Limiter.breaker.allow_request():
+            try:
+                redis = Limiter.redis_client.get_client()
+                script = self.get_script()
+                with timed("limiter"):
+                    acquired = await asyncio.wait_for(
+                        script(
+                            keys=[key],
+                            args=[self.limit, self.lease_ms, lease_id],
+                            client=redis,
+                        ),
+                        timeout=security_settings.RATE_LIMIT_REDIS_TIMEOUT,
+                    )
+                Limiter.breaker.record_success()
+            except Exception as e:
+                logger.warning(f"Concurrency limit check failed for {key}: {e!r}")
+                Limiter.breaker.record_failure()
+
+        # Fail open when Redis is unavailable, the rate limits still apply
+        if acquired is None:
+            yield
+            return
+
+        if not int(acquired):
+            metrics.RATE_LIMIT_DECISIONS_TOTAL.labels(
+                endpoint=endpoint,
+                window=f"{self.limit} in-flight",
+                decision="rejected",
+                source="redis",
+            ).inc()
+            raise HTTPException(
+                status_code=429,
+                detail="Too Many Requests",
+                headers={"Retry-After": "1"},
+            )
+
+        try:
+            yield
+        finally:
+            try:
+                await asyncio.wait_for(
+                    redis.zrem(key, lease_id),
+                    timeout=security_settings.RATE_LIMIT_REDIS_TIMEOUT,
+                )
+            except Exception as e:
+                # The lease expires on its own
+                logger.warning(f"Failed to release concurrency lease for {key}: {e!r}")
+
+    @classmethod
+    def get_script(cls) -> AsyncScript:
+        """
+        Get the registered lease acquisition script, registering it on first use.
+
+        Returns:
+            AsyncScript: The registered script.
+        """
+        if cls.script is None:
+            redis = Limiter.redis_client.get_client()
+            cls.script = redis.register_script(REDIS_LUA_ACQUIRE_LEASE)
+        return cls.script
+
+
+def shared_budget(cost: int) -> Limiter:
+    """
+    Create a limiter charging a request against the per-identity budget shared by all routes.
+
+    Expensive routes (e.g. Argon2 hashing) charge a higher cost, so load cannot be spread
+    across many cheap-looking endpoints to avoid the per-route limits.
+
+    Args:
+        cost (int): Units charged against RATE_LIMIT_SHARED_BUDGET per request.
+    Returns:
+        Limiter: The shared budget limiter.
+    """
+    return Limiter(
+        security_settings.RATE_LIMIT_SHARED_BUDGET, bucket="shared", cost=cost
+    )
+
+
+class LimiterMiddleware:
+    """
+    ASGI middleware enforcing rate limits before routing, body parsing and dependencies.
+
+    On the first request a table of (method, route template) -> limiters is built from the
+    Limiter dependencies declared on the app routes (including mounted apps). Matching
+    requests are checked here and the route dependencies are then skipped, so rejected
+    requests never reach request validation or open a database session. Optional global
+    rules apply to every request reaching the service and service rules to every
+    rate-limited route of it.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        global_rules: str | None = None,
+        service_rules: str | None = None,
+    ) -> None:
+        """
+        Initialize the limiter middleware.
+
+        Args:
+            app (ASGIApp): The ASGI application.
+            global_rules (str, optional): Rules shared by every request to the service.
+            service_rules (str, optional): Rules shared by every rate-limited route.
+        """
+        self.app = app
+        self.global_limiter = (
+            Limiter(global_rules, bucket="global") if global_rules else None
+        )
+        self.service_limiter = (
+            Limiter(service_rules, bucket="service") if service_rules else None
+        )
+        self.resolver = RouteResolver()
+        self.table: dict[tuple[str, str], list[Limiter]] = {}
+        self.table_built = False
+
+    def build_table(self, routes: list[BaseRoute]) -> None:
+        """
+        Collect the Limiter dependencies of the routes, including mounted apps.
+
+        Args:
+            routes (list[BaseRoute]): The routes of the app.
+        """
+        self.resolver.build(routes)
+        for template, route in self.resolver.routes:
+            if not isinstance(route, APIRoute):
+                continue
+            limiters = [
+                dependency.dependency
+                for dependency in route.dependencies
+                if isinstance(dependency.dependency, Limiter)
+            ]
+            if limiters:
+                for method in route.methods:
+                    self.table[(method, template)] = limiters
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not Limiter.enable_limiter:
+            await self.app(scope, receive, send)
+            return
+
+        if not self.table_built:
+            self.build_table(scope["app"].routes)
+            self.table_built = True
+
+        request = Request(scope)
+        limiters: list[Limiter] = []
+        if self.global_limiter:
+            limiters.append(self.global_limiter)
+
+        resolved = self.resolver.resolve(scope)
+        if resolved:
+            template, route = resolved
+            route_limiters = self.table.get((request.method, template))
+            if route_limiters:
+                # The route dependencies read the route template from the scope
+                scope["route"] = route
+                if self.service_limiter:
+                    limiters.append(self.service_limiter)
+                limiters.extend(route_limiters)
+
+        try:
+            with timed("limiter"):
+                for limiter in limiters:
+                    await limiter.check(request)
+        except HTTPException as e:
+            response = JSONResponse(
+                {"detail": e.detail}, status_code=e.status_code, headers=e.headers
+            )
+            await response(scope, receive, send)
+            return
+
+        request.state.checked_limiters = set(limiters)
+        await self.app(scope, receive, send)
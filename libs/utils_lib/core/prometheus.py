@@ -1,14 +1,36 @@
+import fcntl
+import logging
+import os
 import time
 from collections.abc import MutableMapping
-from typing import Any, ClassVar
+from threading import Event, Thread
+from typing import IO, Any, ClassVar
+from wsgiref.simple_server import WSGIServer
 
-from fastapi import Request
-from prometheus_client import Counter, Histogram
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    multiprocess,
+    start_http_server,
+)
 from pydantic_settings import BaseSettings
 from starlette import status
-from starlette.routing import Match
+from starlette.datastructures import MutableHeaders
 from starlette.types import ASGIApp, Receive, Scope, Send
 
+from libs.utils_lib.core.config import settings as utils_lib_settings
+from libs.utils_lib.core.database import track_statements
+from libs.utils_lib.core.routing import RouteResolver
+from libs.utils_lib.core.timing import request_timings
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Request and response body sizes in bytes
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
 
 class Metrics(BaseSettings):
     REQUEST_COUNT: ClassVar[Counter] = Counter(
@@ -19,67 +41,272 @@ class Metrics(BaseSettings):
     REQUEST_TIME: ClassVar[Histogram] = Histogram(
         "http_request_processing_time",
         "HTTP request processing time in seconds",
-        ["method", "endpoint", "status_code"],
+        ["method", "endpoint", "status_code"]
+        if utils_lib_settings.PROMETHEUS_STATUS_CODE_LABEL
+        else ["method", "endpoint"],
+        buckets=utils_lib_settings.PROMETHEUS_LATENCY_BUCKETS,
+    )
+    REQUEST_COMPONENT_TIME: ClassVar[Histogram] = Histogram(
+        "http_request_component_time",
+        "Time spent per component (db, redis, nats, argon2, limiter) by HTTP requests in seconds",
+        ["endpoint", "component"],
+        buckets=utils_lib_settings.PROMETHEUS_LATENCY_BUCKETS,
+    )
+    REQUESTS_IN_PROGRESS: ClassVar[Gauge] = Gauge(
+        "http_requests_in_progress",
+        "HTTP requests currently being processed",
+        ["method", "endpoint"],
+        multiprocess_mode="livesum",
+    )
+    REQUEST_SIZE: ClassVar[Histogram] = Histogram(
+        "http_request_size_bytes",
+        "HTTP request body size in bytes",
+        ["method", "endpoint"],
+        buckets=SIZE_BUCKETS,
+    )
+    RESPONSE_SIZE: ClassVar[Histogram] = Histogram(
+        "http_response_size_bytes",
+        "HTTP response body size in bytes",
+        ["method", "endpoint"],
+        buckets=SIZE_BUCKETS,
+    )
+    RATE_LIMIT_DECISIONS_TOTAL: ClassVar[Counter] = Counter(
+        "rate_limiter_decisions_total",
+        "Total rate limiter decisions by route, tripped window and deciding tier",
+        ["endpoint", "window", "decision", "source"],
+    )
+    RATE_LIMIT_REDIS_LATENCY: ClassVar[Histogram] = Histogram(
+        "rate_limiter_redis_latency_seconds",
+        "Rate limiter Redis check latency in seconds",
+        ["algorithm"],
+        buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+    )
+    RATE_LIMIT_TRACKED_IDENTITIES: ClassVar[Gauge] = Gauge(
+        "rate_limiter_tracked_identities",
+        "Identity states held in-process per route or bucket, across its limiters",
+        ["endpoint"],
+        multiprocess_mode="livesum",
+    )
+    RATE_LIMIT_CIRCUIT_BREAKER_STATE: ClassVar[Gauge] = Gauge(
+        "rate_limiter_circuit_breaker_state",
+        "State of the rate limiter Redis circuit breaker (0 closed, 1 open, 2 half open)",
+        ["breaker"],
+        multiprocess_mode="livemax",
     )
 
 
 metrics = Metrics()
 
 
+class MetricsExporter:
+    """
+    Serves the Prometheus metrics of a service on a separate port.
+
+    When PROMETHEUS_MULTIPROC_DIR is set (multiple server workers), every worker writes its
+    metrics to that directory and the first worker to lock it is elected primary: it serves
+    the metrics aggregated across workers and runs the startup tasks needed once per pod.
+    The lock is released when the primary exits, the other workers retry it periodically so
+    one of them takes over serving the metrics.
+    """
+
+    def __init__(self, port: int = 9000, election_interval: float = 5.0) -> None:
+        """
+        Initialize the metrics exporter.
+
+        Args:
+            port (int, optional): The port to serve the metrics on. Defaults to 9000.
+            election_interval (float, optional): Seconds between the lock attempts of the
+                workers which are not primary. Defaults to 5.0.
+        """
+        self.port = port
+        self.election_interval = election_interval
+        self.multiproc_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+        self.is_primary = False
+        self.lock_file: IO[str] | None = None
+        self.server: WSGIServer | None = None
+        self.thread: Thread | None = None
+        self.election_thread: Thread | None = None
+        self.stopped = Event()
+
+    def start(self) -> bool:
+        """
+        Start serving the metrics if this process is the primary worker, otherwise keep
+        trying to become primary in the background.
+
+        Returns:
+            bool: True if this process is the primary worker.
+        """
+        if not self.multiproc_dir:
+            self.server, self.thread = start_http_server(self.port)
+            self.is_primary = True
+            return True
+
+        if self.elect(self.multiproc_dir):
+            return True
+
+        self.election_thread = Thread(
+            target=self.wait_for_election, args=(self.multiproc_dir,), daemon=True
+        )
+        self.election_thread.start()
+        return False
+
+    def elect(self, multiproc_dir: str) -> bool:
+        """
+        Try to lock the metrics directory and serve the aggregated metrics.
+
+        Args:
+            multiproc_dir (str): The metrics directory of the workers.
+        Returns:
+            bool: True if this process became the primary worker.
+        """
+        lock_file = open(os.path.join(multiproc_dir, "exporter.lock"), "w")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return False
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry, path=multiproc_dir)  # type: ignore[no-untyped-call]
+        try:
+            self.server, self.thread = start_http_server(self.port, registry=registry)
+        except OSError as e:
+            # The port of the previous primary is not released yet, retried later
+            logger.warning(f"Failed to serve metrics on port {self.port}: {e!r}")
+            lock_file.close()
+            return False
+        self.lock_file = lock_file
+        self.is_primary = True
+        logger.info(f"Worker {os.getpid()} elected primary, serving metrics.")
+        return True
+
+    def wait_for_election(self, multiproc_dir: str) -> None:
+        """
+        Retry the election until this process becomes primary or stops.
+
+        Args:
+            multiproc_dir (str): The metrics directory of the workers.
+        """
+        while not self.stopped.wait(self.election_interval):
+            if self.elect(multiproc_dir):
+                return
+
+    def stop(self) -> None:
+        """
+        Stop serving the metrics and release the metric files of this process.
+        """
+        self.stopped.set()
+        if self.election_thread:
+            self.election_thread.join()
+        if self.server:
+            self.server.shutdown()
+        if self.thread:
+            self.thread.join()
+        if self.lock_file:
+            self.lock_file.close()
+        if self.multiproc_dir:
+            # Drop the live gauges of this process from the aggregated metrics
+            multiprocess.mark_process_dead(os.getpid(), path=self.multiproc_dir)  # type: ignore[no-untyped-call]
+
+
+def get_server_timing(timings: dict[str, float], start_time: float) -> str:
+    """
+    Format the time breakdown of a request as a Server-Timing header value.
+
+    Args:
+        timings (dict[str, float]): Seconds spent per component.
+        start_time (float): The perf_counter value at the start of the request.
+    Returns:
+        str: The header value, durations in milliseconds.
+    """
+    entries = [
+        f"{component};dur={seconds * 1000:.2f}"
+        for component, seconds in timings.items()
+    ]
+    entries.append(f"total;dur={(time.perf_counter() - start_time) * 1000:.2f}")
+    return ", ".join(entries)
+
+
 class PrometheusMiddleware:
     def __init__(
         self,
         app: ASGIApp,
         skip_endpoints: set[str] | None = None,
         root_path: str | None = None,
+        server_timing: bool | None = None,
     ) -> None:
         self.app = app
         self.skip_endpoints = skip_endpoints or set()
+        self.resolver = RouteResolver()
+        self.server_timing = (
+            utils_lib_settings.PROMETHEUS_SERVER_TIMING
+            if server_timing is None
+            else server_timing
+        )
 
         if root_path:
             self.skip_endpoints |= {f"{root_path}{i}" for i in skip_endpoints or set()}
 
-    def resolve_path(self, request: Request) -> str:
-        """
-        Resolve the request path to match the defined routes.
-
-        Args:
-            request (Request): The incoming HTTP request.
-        """
-        for route in request.app.routes:
-            match, _ = route.matches(request.scope)
-            if match == Match.FULL:
-                return getattr(route, "path", request.url.path)
-        # Fallback to the actual URL path if no route matches
-        return request.url.path
-
     async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         if scope["type"] != "http":
             await self.app(scope, receive, send)
             return
 
-        request = Request(scope)
-
-        endpoint = self.resolve_path(request)
+        resolved = self.resolver.resolve(scope)
+        # Fallback to the actual URL path if no route matches
+        endpoint = resolved[0] if resolved else scope["path"]
 
         if endpoint in self.skip_endpoints:
             await self.app(scope, receive, send)
             return
 
-        method = request.method
+        method = scope["method"]
         start_time = time.perf_counter()
         status_code = status.HTTP_408_REQUEST_TIMEOUT
+        request_size = 0
+        response_size = 0
+        timings: dict[str, float] = {}
+        timings_token = request_timings.set(timings)
+
+        # Define a custom receive to measure the request body
+        async def metrics_receive() -> MutableMapping[str, Any]:
+            nonlocal request_size
+            message = await receive()
+            if message["type"] == "http.request":
+                request_size += len(message.get("body", b""))
+            return message
 
-        # Define a custom send to intercept the response status
+        # Define a custom send to intercept the response status and measure the body
         async def metrics_send(message: MutableMapping[str, Any]) -> None:
-            nonlocal status_code
+            nonlocal status_code, response_size
             if message["type"] == "http.response.start":
                 status_code = message["status"]
+                if self.server_timing:
+                    MutableHeaders(scope=message).append(
+                        "Server-Timing", get_server_timing(timings, start_time)
+                    )
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
             await send(message)
 
+        # Unmatched paths are not tracked in flight, they would add a series per URL
+        in_progress = (
+            metrics.REQUESTS_IN_PROGRESS.labels(method=method, endpoint=endpoint)
+            if resolved
+            else None
+        )
+        if in_progress:
+            in_progress.inc()
         try:
-            await self.app(scope, receive, metrics_send)
+            if resolved:
+                with track_statements(endpoint):
+                    await self.app(scope, metrics_receive, metrics_send)
+            else:
+                await self.app(scope, metrics_receive, metrics_send)
         finally:
+            request_timings.reset(timings_token)
+            if in_progress:
+                in_progress.dec()
             if status_code != 404:
                 process_time = time.perf_counter() - start_time
                 labels = {
@@ -87,8 +314,23 @@ class PrometheusMiddleware:
                     "endpoint": endpoint,
                     "status_code": status_code,
                 }
+                time_labels = (
+                    labels
+                    if utils_lib_settings.PROMETHEUS_STATUS_CODE_LABEL
+                    else {"method": method, "endpoint": endpoint}
+                )
                 try:
                     metrics.REQUEST_COUNT.labels(**labels).inc()
-                    metrics.REQUEST_TIME.labels(**labels).observe(process_time)
+                    metrics.REQUEST_TIME.labels(**time_labels).observe(process_time)
+                    metrics.REQUEST_SIZE.labels(
+                        method=method, endpoint=endpoint
+                    ).observe(request_size)
+                    metrics.RESPONSE_SIZE.labels(
+                        method=method, endpoint=endpoint
+                    ).observe(response_size)
+                    for component, seconds in timings.items():
+                        metrics.REQUEST_COMPONENT_TIME.labels(
+                            endpoint=endpoint, component=component
+                        ).observe(seconds)
                 except Exception:
                     pass
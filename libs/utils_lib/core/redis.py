@@ -5,16 +5,27 @@ from redis.asyncio import ConnectionPool, Redis
 from redis.exceptions import RedisError
 
 from libs.utils_lib.core.config import settings as utils_lib_settings
+from libs.utils_lib.core.timing import timed
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+class TimedRedis(Redis):
+    """
+    Redis client attributing the time of its commands to the current request.
+    """
+
+    async def execute_command(self, *args: Any, **options: Any) -> Any:
+        with timed("redis"):
+            return await super().execute_command(*args, **options)  # type: ignore[no-untyped-call]
+
+
 class RedisClient:
     def __init__(self, redis_url: str):
         self.redis_url = redis_url
         self._pool: ConnectionPool | None = None
-        self._client: Redis | None = None
+        self._client: TimedRedis | None = None
 
     async def connect(self) -> None:
         """
@@ -29,7 +40,7 @@ class RedisClient:
             if not self._pool:
                 raise RedisError("Failed to create Redis connection pool.")
 
-            self._client = Redis(connection_pool=self._pool)
+            self._client = TimedRedis(connection_pool=self._pool)
             redis = self.get_client()
             await redis.ping()
             logger.info("Successfully established Redis connection.")
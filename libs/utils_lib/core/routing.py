@@ -0,0 +1,112 @@
+from collections import OrderedDict
+from re import Pattern
+
+from starlette.routing import BaseRoute, Mount, compile_path
+from starlette.types import Scope
+
+
+def get_route_path(scope: Scope) -> str:
+    """
+    Get the path of a request relative to the root path the app is served under.
+
+    Args:
+        scope (Scope): The ASGI scope of the request.
+    Returns:
+        str: The path matched against the routes.
+    """
+    path: str = scope["path"]
+    root_path: str = scope.get("root_path", "")
+    # Only strip the root path at a segment boundary, "/api" is not a prefix of "/apix"
+    if root_path and path.startswith(root_path):
+        if path == root_path:
+            return ""
+        if path[len(root_path)] == "/":
+            return path[len(root_path) :]
+    return path
+
+
+class RouteResolver:
+    """
+    Resolves requests to their route template without walking the router.
+
+    The routes of the app (including mounted apps, with their mount prefix) are compiled
+    once. Paths of routes without parameters resolve with a dictionary lookup, other
+    matched paths are kept in a bounded LRU cache keyed by (method, path).
+    """
+
+    def __init__(self, max_size: int = 1024) -> None:
+        """
+        Initialize the route resolver.
+
+        Args:
+            max_size (int, optional): Maximum number of cached dynamic paths. Defaults to 1024.
+        """
+        self.max_size = max_size
+        self.built = False
+        self.routes: list[tuple[str, BaseRoute]] = []
+        self.patterns: list[tuple[Pattern[str], str, BaseRoute]] = []
+        self.static: dict[str, list[tuple[str, BaseRoute]]] = {}
+        self.cache: OrderedDict[tuple[str, str], tuple[str, BaseRoute]] = OrderedDict()
+
+    def build(self, routes: list[BaseRoute], prefix: str = "") -> None:
+        """
+        Compile the routes, recursing into mounted apps.
+
+        Args:
+            routes (list[BaseRoute]): The routes to compile.
+            prefix (str, optional): The mount path of the routes. Defaults to "".
+        """
+        for route in routes:
+            if isinstance(route, Mount):
+                self.build(route.routes, prefix + route.path)
+                continue
+            path = getattr(route, "path", None)
+            if path is None or getattr(route, "methods", None) is None:
+                continue
+
+            template = prefix + path
+            regex, _, param_convertors = compile_path(template)
+            self.routes.append((template, route))
+            self.patterns.append((regex, template, route))
+            # A parameterised route registered earlier would win the match in the router
+            if not param_convertors and not any(
+                earlier.match(template) for earlier, _, _ in self.patterns[:-1]
+            ):
+                self.static.setdefault(template, []).append((template, route))
+
+        self.built = True
+
+    def resolve(self, scope: Scope) -> tuple[str, BaseRoute] | None:
+        """
+        Resolve the route template fully matching a request (path and method).
+
+        Args:
+            scope (Scope): The ASGI scope of the request.
+        Returns:
+            tuple[str, BaseRoute] | None: The route template and route, or None if no route matches.
+        """
+        if not self.built:
+            self.build(scope["app"].routes)
+
+        method = scope["method"]
+        path = get_route_path(scope)
+        candidates = self.static.get(path)
+        if candidates:
+            for template, route in candidates:
+                if method in route.methods:  # type: ignore[attr-defined]
+                    return template, route
+
+        key = (method, path)
+        cached = self.cache.get(key)
+        if cached:
+            self.cache.move_to_end(key)
+            return cached
+
+        for regex, template, route in self.patterns:
+            if method in route.methods and regex.match(path):  # type: ignore[attr-defined]
+                # Only matched paths are cached, so unknown URLs cannot flood the cache
+                self.cache[key] = (template, route)
+                if len(self.cache) > self.max_size:
+                    self.cache.popitem(last=False)
+                return template, route
+        return None
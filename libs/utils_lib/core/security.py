@@ -1,4 +1,4 @@
-from typing import Any, cast
+from typing import Any, Literal, cast
 
 from fastapi import HTTPException, Request, status
 from itsdangerous import URLSafeTimedSerializer
@@ -11,6 +11,24 @@ from libs.utils_lib.core.config import settings as utils_lib_settings
 # Security Settings
 class SecuritySettings(BaseSettings):
     # Rate limit settings
+    # Redis layout of limiter state, one key per window or one hash per identity
+    RATE_LIMIT_STORAGE: Literal["keys", "hash"] = "keys"
+    RATE_LIMIT_GLOBAL_RULES: str | None = None  # Shared by every request to a service
+    RATE_LIMIT_SERVICE_RULES: str | None = None  # Shared by every rate-limited route
+    RATE_LIMIT_SHARED_BUDGET: str = "200/minute,2000/hour"  # Cost-weighted budget
+    # In-process tier (identities tracked per limiter, share of a limit admitted
+    # without Redis and seconds before locally admitted hits are synced)
+    RATE_LIMIT_LOCAL_MAX_KEYS: int = 10000
+    RATE_LIMIT_LOCAL_ERROR_BOUND: float = 0.0
+    RATE_LIMIT_LOCAL_SYNC_INTERVAL: float = 1.0
+    # Redis time budget per check, and consecutive failures opening the circuit
+    # breaker / seconds before Redis is retried
+    RATE_LIMIT_REDIS_TIMEOUT: float = 0.05
+    RATE_LIMIT_BREAKER_FAILURE_THRESHOLD: int = 5
+    RATE_LIMIT_BREAKER_RESET_TIMEOUT: float = 30.0
+    # Seconds before an in-flight concurrency lease expires
+    RATE_LIMIT_CONCURRENCY_LEASE: float = 30.0
+
     @computed_field  # type: ignore[prop-decorator]
     @property
     def ENABLE_RATE_LIMIT(self) -> bool:
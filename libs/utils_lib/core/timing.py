@@ -0,0 +1,83 @@
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, TypeVar
+
+from fastapi.concurrency import run_in_threadpool
+
+T = TypeVar("T")
+
+# Seconds spent per component (db, redis, nats, ...) by the current request
+request_timings: ContextVar[dict[str, float] | None] = ContextVar(
+    "request_timings", default=None
+)
+# Component being timed by the current task, the time of nested components goes to it
+timed_component: ContextVar[str | None] = ContextVar("timed_component", default=None)
+
+
+def record(component: str, seconds: float) -> None:
+    """
+    Attribute time to a component of the current request, outside of requests it is ignored.
+
+    Args:
+        component (str): The name of the component.
+        seconds (float): The time spent in the component.
+    """
+    timings = request_timings.get()
+    if timings is not None:
+        timings[component] = timings.get(component, 0.0) + seconds
+
+
+@contextmanager
+def timed(component: str) -> Iterator[None]:
+    """
+    Attribute the time spent in the block to a component of the current request.
+
+    Inside another timed block, the time is left to the outer component so it is not
+    counted twice (e.g. the Redis commands of the limiter only count as limiter time).
+
+    Args:
+        component (str): The name of the component.
+    """
+    if timed_component.get() is not None:
+        yield
+        return
+
+    token = timed_component.set(component)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(component, time.perf_counter() - start)
+        timed_component.reset(token)
+
+
+async def run_in_threadpool_timed(
+    component: str, func: Callable[..., T], *args: Any
+) -> T:
+    """
+    Run a function in the threadpool, attributing the time spent waiting for a thread
+    to "{component}_wait" and the time running it to the component.
+
+    Args:
+        component (str): The name of the component.
+        func (Callable): The blocking function to run.
+        *args: The arguments of the function.
+    Returns:
+        T: The result of the function.
+    """
+    submitted = time.perf_counter()
+    started = 0.0
+
+    def run() -> T:
+        nonlocal started
+        started = time.perf_counter()
+        return func(*args)
+
+    try:
+        return await run_in_threadpool(run)
+    finally:
+        if started:
+            record(f"{component}_wait", started - submitted)
+            record(component, time.perf_counter() - started)
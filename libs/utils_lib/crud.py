@@ -1,11 +1,20 @@
-from datetime import datetime, timedelta
+import re
+from datetime import date, datetime, timedelta
 from typing import Any
 from uuid import UUID
 
+from sqlalchemy import delete, insert, text
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from libs.utils_lib.models import EventInbox, EventOutbox, EventStatus, Jobs, JobStatus
+from libs.utils_lib.models import (
+    EventInbox,
+    EventInboxId,
+    EventOutbox,
+    EventStatus,
+    Jobs,
+    JobStatus,
+)
 
 
 # CRUD operations for EventInbox
@@ -17,7 +26,8 @@ async def create_inbox_event(
     commit: bool = True,
 ) -> EventInbox:
     """
-    Create an event inbox record.
+    Create an event inbox record, along with its id in the received event ids. A received
+    event is rejected by the primary key of the ids, the inbox one includes created_at.
 
     Args:
         session (AsyncSession): The database session.
@@ -30,6 +40,7 @@ async def create_inbox_event(
     """
     event_inbox = EventInbox(id=event_id, event_type=event_type, data=data)
     session.add(event_inbox)
+    session.add(EventInboxId(id=event_id, created_at=event_inbox.created_at))
 
     if commit:
         await session.commit()
@@ -54,6 +65,26 @@ async def get_inbox_event(session: AsyncSession, event_id: UUID) -> EventInbox |
     return result.one_or_none()
 
 
+async def delete_expired_inbox_ids(
+    session: AsyncSession, expires_at: datetime, commit: bool = True
+) -> None:
+    """
+    Delete the received event ids older than the inbox retention.
+
+    Args:
+        session (AsyncSession): The database session.
+        expires_at (datetime): The time before which the ids are deleted.
+        commit (bool): Commit at the end of the operation.
+    """
+    stmt = delete(EventInboxId).where(
+        EventInboxId.created_at < expires_at  # type: ignore[arg-type]
+    )
+    await session.execute(stmt)
+
+    if commit:
+        await session.commit()
+
+
 # CRUD operations for EventOutbox
 async def create_outbox_event(
     session: AsyncSession,
@@ -84,6 +115,34 @@ async def create_outbox_event(
     return event_outbox
 
 
+async def create_outbox_events(
+    session: AsyncSession,
+    events: list[EventOutbox],
+    commit: bool = True,
+) -> list[EventOutbox]:
+    """
+    Create event outbox records with a single multi-row INSERT ... RETURNING statement.
+
+    Args:
+        session (AsyncSession): The database session.
+        events (list[EventOutbox]): The events to create.
+        commit (bool): Commit at the end of the operation.
+
+    Returns:
+        list[EventOutbox]: The event outbox records, in the order of the events.
+    """
+    stmt = insert(EventOutbox).returning(EventOutbox, sort_by_parameter_order=True)
+    result = await session.execute(
+        stmt, params=[event.model_dump() for event in events]
+    )
+    event_outboxes: list[EventOutbox] = list(result.scalars())
+
+    if commit:
+        await session.commit()
+
+    return event_outboxes
+
+
 async def get_outbox_event(session: AsyncSession, event_id: UUID) -> EventOutbox | None:
     """
     Get an event outbox record by ID.
@@ -142,6 +201,131 @@ async def get_pending_outbox_events(
     return list(result.all())
 
 
+# CRUD operations for event partitions
+def quote(session: AsyncSession, name: str) -> str:
+    """
+    Quote a table or schema name for the partition DDL statements.
+
+    Args:
+        session (AsyncSession): The database session.
+        name (str): The table or schema name.
+
+    Returns:
+        str: The quoted name.
+    """
+    return session.get_bind().dialect.identifier_preparer.quote(name)
+
+
+async def get_event_partitions(
+    session: AsyncSession, table: str
+) -> list[tuple[str, datetime | None]]:
+    """
+    Get the partitions of an event table with their upper bound.
+
+    Args:
+        session (AsyncSession): The database session.
+        table (str): The partitioned table name.
+
+    Returns:
+        list[tuple[str, datetime | None]]: The partition names and upper bounds, None for
+            the default partition.
+    """
+    result = await session.execute(
+        text(
+            "SELECT child.relname, pg_get_expr(child.relpartbound, child.oid) "
+            "FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = :table AND pg_table_is_visible(parent.oid)"
+        ),
+        params={"table": table},
+    )
+
+    partitions = []
+    for name, bound in result.all():
+        # Bounds look like: FOR VALUES FROM ('2025-01-01 00:00:00') TO ('2025-01-02 00:00:00')
+        upper = re.search(r"TO \('([^']+)'\)", bound)
+        partitions.append(
+            (name, datetime.fromisoformat(upper.group(1)) if upper else None)
+        )
+    return partitions
+
+
+async def create_event_partition(
+    session: AsyncSession, table: str, day: date, commit: bool = True
+) -> None:
+    """
+    Create the partition of an event table holding the events of a day, if missing.
+
+    Args:
+        session (AsyncSession): The database session.
+        table (str): The partitioned table name.
+        day (date): The day of the partition.
+        commit (bool): Commit at the end of the operation.
+    """
+    partition = quote(session, f"{table}_p{day:%Y%m%d}")
+    await session.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {partition} PARTITION OF {quote(session, table)} "
+            f"FOR VALUES FROM ('{day}') TO ('{day + timedelta(days=1)}')"
+        )
+    )
+
+    if commit:
+        await session.commit()
+
+
+async def has_unprocessed_events(session: AsyncSession, partition: str) -> bool:
+    """
+    Check if a partition of an event table still has pending or failed events.
+
+    Args:
+        session (AsyncSession): The database session.
+        partition (str): The partition name.
+
+    Returns:
+        bool: True if the partition has unprocessed events.
+    """
+    result = await session.execute(
+        text(
+            f"SELECT EXISTS (SELECT 1 FROM {quote(session, partition)} "
+            "WHERE status IN ('pending', 'failed'))"
+        )
+    )
+    return bool(result.scalar_one())
+
+
+async def drop_event_partition(
+    session: AsyncSession,
+    table: str,
+    partition: str,
+    archive_schema: str | None = None,
+    commit: bool = True,
+) -> None:
+    """
+    Drop a partition of an event table, or detach it and move it to an archive schema.
+
+    Args:
+        session (AsyncSession): The database session.
+        table (str): The partitioned table name.
+        partition (str): The partition name.
+        archive_schema (str, optional): The schema receiving the partition instead of
+            dropping it.
+        commit (bool): Commit at the end of the operation.
+    """
+    table, partition = quote(session, table), quote(session, partition)
+    if archive_schema:
+        schema = quote(session, archive_schema)
+        await session.execute(text(f"CREATE SCHEMA IF NOT EXISTS {schema}"))
+        await session.execute(text(f"ALTER TABLE {table} DETACH PARTITION {partition}"))
+        await session.execute(text(f"ALTER TABLE {partition} SET SCHEMA {schema}"))
+    else:
+        await session.execute(text(f"DROP TABLE {partition}"))
+
+    if commit:
+        await session.commit()
+
+
 # CRUD operations for Tasks
 async def create_job(
     session: AsyncSession,
@@ -3,7 +3,8 @@ from enum import Enum
 from typing import Any
 from uuid import UUID, uuid4
 
-from sqlalchemy import JSON, Column, Text
+from sqlalchemy import JSON, Column, Index, PrimaryKeyConstraint, Text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlmodel import Field, SQLModel
 
 
@@ -49,14 +50,49 @@ class JobsBase(SQLModel):
 
 # Database models
 class EventInbox(EventBase, table=True):
+    # Partitioned by day (see maintain_event_partitions), so the partition key is part of
+    # the primary key, with a partial index of the events still to process
+    __table_args__ = (
+        PrimaryKeyConstraint("id", "created_at"),
+        Index(
+            "ix_eventinbox_status_created_at",
+            "status",
+            "created_at",
+            postgresql_where="status IN ('pending', 'failed')",
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
     id: UUID = Field(primary_key=True)
-    data: dict[str, Any] = Field(default={}, sa_column=Column(JSON))
+    created_at: datetime = Field(default_factory=datetime.utcnow, primary_key=True)
+    data: dict[str, Any] = Field(default={}, sa_column=Column(JSONB))
     error_message: str | None = Field(default=None, sa_column=Column(Text))
 
 
+class EventInboxId(SQLModel, table=True):
+    # The primary key of the partitioned inbox includes the partition key, so the ids of
+    # the received events are kept unique here, until the inbox retention
+    id: UUID = Field(primary_key=True)
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+
+
 class EventOutbox(EventBase, table=True):
+    # Partitioned by day (see maintain_event_partitions), so the partition key is part of
+    # the primary key, with a partial index of the events still to publish
+    __table_args__ = (
+        PrimaryKeyConstraint("id", "created_at"),
+        Index(
+            "ix_eventoutbox_status_created_at",
+            "status",
+            "created_at",
+            postgresql_where="status IN ('pending', 'failed')",
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
     id: UUID = Field(primary_key=True)
-    data: dict[str, Any] = Field(default={}, sa_column=Column(JSON))
+    created_at: datetime = Field(default_factory=datetime.utcnow, primary_key=True)
+    data: dict[str, Any] = Field(default={}, sa_column=Column(JSONB))
     error_message: str | None = Field(default=None, sa_column=Column(Text))
 
 
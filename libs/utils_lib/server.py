@@ -0,0 +1,236 @@
+"""
+Pre-fork server running a service app in multiple uvicorn workers.
+
+The app (and the libs it imports) is loaded once in the master process, the objects
+created so far are moved out of the garbage collector's reach with gc.freeze() and the
+workers are forked afterwards, so they share those memory pages copy-on-write instead of
+each importing everything again. Connection pools are only created by the app lifespan,
+which runs in every worker after the fork.
+
+Usage:
+    python -m libs.utils_lib.server src.main:app --workers 4
+"""
+
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from types import FrameType
+
+import uvicorn
+from prometheus_client import multiprocess
+from uvicorn.main import STARTUP_FAILURE
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class PreforkServer:
+    """
+    Master process forking, supervising and restarting the uvicorn workers.
+
+    Workers exiting shortly after they started are restarted with an exponential backoff,
+    and the master gives up (exiting non-zero) once too many of them failed in a row.
+
+    Args:
+        config (uvicorn.Config): The uvicorn configuration of the workers.
+        workers (int): The number of worker processes.
+        shutdown_timeout (float): Seconds to wait for workers to exit before killing them.
+        min_uptime (float): Seconds a worker must run to not count as a failed start.
+        restart_delay (float): Seconds before restarting a worker after a failed start,
+            doubled on every consecutive failure.
+        max_restart_delay (float): Maximum seconds before restarting a worker.
+        max_failures (int): Consecutive failed starts after which the master exits.
+    """
+
+    def __init__(
+        self,
+        config: uvicorn.Config,
+        workers: int,
+        shutdown_timeout: float = 30.0,
+        min_uptime: float = 10.0,
+        restart_delay: float = 1.0,
+        max_restart_delay: float = 30.0,
+        max_failures: int = 5,
+    ) -> None:
+        self.config = config
+        self.workers = workers
+        self.shutdown_timeout = shutdown_timeout
+        self.min_uptime = min_uptime
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.max_failures = max_failures
+        # Start time of the running workers and due time of the pending restarts
+        self.processes: dict[int, float] = {}
+        self.restarts: list[float] = []
+        self.failures = 0
+        self.exit_code = 0
+        self.sock: socket.socket | None = None
+        self.should_exit = False
+
+    def run(self) -> int:
+        """
+        Preload the app, fork the workers and supervise them until a shutdown signal.
+
+        Returns:
+            int: The exit code of the master, 1 if it gave up restarting the workers.
+        """
+        self.config.load()
+        self.sock = self.config.bind_socket()
+
+        # Objects created so far are never collected, so the pages holding them are not
+        # written to by the collector and stay shared with the workers
+        gc.collect()
+        gc.freeze()
+
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, self.handle_exit)
+
+        logger.info(f"Preloaded app in master process [{os.getpid()}]")
+        for _ in range(self.workers):
+            self.spawn()
+
+        while not self.should_exit:
+            self.reap(restart=True)
+            now = time.monotonic()
+            for due in [due for due in self.restarts if due <= now]:
+                self.restarts.remove(due)
+                self.spawn()
+            time.sleep(0.5)
+
+        self.shutdown()
+        if self.sock:
+            self.sock.close()
+        return self.exit_code
+
+    def spawn(self) -> None:
+        """
+        Fork a worker serving the preloaded app on the socket bound by the master.
+        """
+        pid = os.fork()
+        if pid:
+            self.processes[pid] = time.monotonic()
+            return
+
+        # Worker process, uvicorn installs its own signal handlers while serving
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, signal.SIG_DFL)
+        exit_code = 1
+        try:
+            server = uvicorn.Server(self.config)
+            server.run(sockets=[self.sock] if self.sock else None)
+            # The server returns without serving when the app startup fails
+            exit_code = 0 if server.started else STARTUP_FAILURE
+        except SystemExit as error:
+            exit_code = error.code if isinstance(error.code, int) else 1
+        except Exception:
+            logger.exception(f"Worker [{os.getpid()}] crashed.")
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(exit_code)
+
+    def reap(self, restart: bool = False) -> None:
+        """
+        Collect the exited workers.
+
+        Args:
+            restart (bool, optional): Whether to schedule the restart of the exited
+                workers. Defaults to False.
+        """
+        while self.processes:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                return
+            started_at = self.processes.pop(pid)
+            self.mark_process_dead(pid)
+            if not restart or self.should_exit:
+                continue
+
+            exit_code = os.waitstatus_to_exitcode(status)
+            if time.monotonic() - started_at < self.min_uptime:
+                self.failures += 1
+            else:
+                self.failures = 0
+
+            if self.failures >= self.max_failures:
+                logger.error(
+                    f"Worker [{pid}] exited with code {exit_code}, {self.failures} "
+                    "workers failed to start in a row, shutting down."
+                )
+                self.should_exit = True
+                self.exit_code = 1
+                continue
+
+            delay = 0.0
+            if self.failures:
+                delay = min(
+                    self.restart_delay * 2 ** (self.failures - 1),
+                    self.max_restart_delay,
+                )
+            logger.warning(
+                f"Worker [{pid}] exited with code {exit_code}, restarting it in {delay}s."
+            )
+            self.restarts.append(time.monotonic() + delay)
+
+    def shutdown(self) -> None:
+        """
+        Stop the workers gracefully, killing those still running after the timeout.
+        """
+        for pid in self.processes:
+            os.kill(pid, signal.SIGTERM)
+
+        deadline = time.monotonic() + self.shutdown_timeout
+        while self.processes and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+
+        for pid in self.processes:
+            logger.warning(f"Worker [{pid}] did not exit in time, killing it.")
+            os.kill(pid, signal.SIGKILL)
+        while self.processes:
+            pid, _ = os.waitpid(-1, 0)
+            self.processes.pop(pid, None)
+            self.mark_process_dead(pid)
+
+    def handle_exit(self, sig: int, frame: FrameType | None) -> None:
+        """
+        Signal handler requesting the shutdown of the server.
+        """
+        self.should_exit = True
+
+    @staticmethod
+    def mark_process_dead(pid: int) -> None:
+        """
+        Remove the live gauges of a dead worker from the multiprocess metrics.
+
+        Args:
+            pid (int): The process ID of the worker.
+        """
+        if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+            multiprocess.mark_process_dead(pid)  # type: ignore[no-untyped-call]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("app", help="The app import string, e.g. src.main:app")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1)
+    options = parser.parse_args()
+
+    config = uvicorn.Config(
+        options.app,
+        host=options.host,
+        port=options.port,
+        proxy_headers=True,
+    )
+    sys.exit(PreforkServer(config, workers=options.workers).run())
+
+
+if __name__ == "__main__":
+    main()
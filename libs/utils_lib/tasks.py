@@ -1,7 +1,7 @@
 import importlib
 import time
 from collections.abc import Awaitable, Callable
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Any, ClassVar, cast
 
 from prometheus_client import Counter, Histogram
@@ -10,15 +10,22 @@ from pydantic_settings import BaseSettings
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from libs.utils_lib.api.events import handle_publish_event
+from libs.utils_lib.core.config import settings as utils_lib_settings
+from libs.utils_lib.core.database import track_statements
 from libs.utils_lib.core.taskiq import logger, schedule_source
 from libs.utils_lib.crud import (
+    create_event_partition,
+    delete_expired_inbox_ids,
+    drop_event_partition,
+    get_event_partitions,
     get_failed_outbox_events,
     get_job_by_name,
     get_pending_outbox_events,
     get_persistent_failed_jobs,
     get_persistent_missed_jobs,
+    has_unprocessed_events,
 )
-from libs.utils_lib.models import EventStatus, Jobs, JobStatus
+from libs.utils_lib.models import EventInbox, EventOutbox, EventStatus, Jobs, JobStatus
 
 
 class Metrics(BaseSettings):
@@ -42,6 +49,11 @@ class Metrics(BaseSettings):
         "Total number of outbox events re-sent.",
         ["reason"],
     )
+    EVENT_PARTITIONS_EXPIRED_TOTAL: ClassVar[Counter] = Counter(
+        "taskiq_event_partitions_expired_total",
+        "Total number of expired event partitions dropped or archived.",
+        ["table", "action"],
+    )
 
 
 metrics = Metrics()
@@ -131,7 +143,8 @@ async def handle_run_task(
     status = "failure"
 
     try:
-        await task_function(*args, **kwargs)
+        with track_statements(task_name):
+            await task_function(*args, **kwargs)
         if job:
             await update_job_status(session, job, JobStatus.completed)
         status = "success"
@@ -244,3 +257,62 @@ async def resend_outbox_events(session: AsyncSession) -> None:
         event.retries += 1
 
     await session.commit()
+
+
+async def maintain_event_partitions(session: AsyncSession) -> None:
+    """
+    Task to create the upcoming daily partitions of the event outbox and inbox tables, and
+    drop (or archive) the partitions older than their retention, along with the expired
+    received event ids.
+
+    Args:
+        session (AsyncSession): The database session.
+    """
+    today = datetime.utcnow().date()
+    retention = {
+        EventOutbox.__tablename__: utils_lib_settings.EVENT_OUTBOX_RETENTION_DAYS,
+        EventInbox.__tablename__: utils_lib_settings.EVENT_INBOX_RETENTION_DAYS,
+    }
+
+    for table, days in retention.items():
+        # Today's partition was created by an earlier run, creating one for a day whose events
+        # already went to the default partition would fail
+        for offset in range(1, utils_lib_settings.EVENT_PARTITION_PREMAKE_DAYS + 1):
+            try:
+                await create_event_partition(
+                    session, str(table), today + timedelta(days=offset)
+                )
+            except Exception as e:
+                await session.rollback()
+                logger.error(f"Error creating {table} partition: {str(e)}")
+
+        expires_at = datetime.combine(today - timedelta(days=days), datetime.min.time())
+        for partition, upper_bound in await get_event_partitions(session, str(table)):
+            # The default partition has no bound and is never dropped
+            if upper_bound is None or upper_bound > expires_at:
+                continue
+            if await has_unprocessed_events(session, partition):
+                logger.warning(
+                    f"Keeping expired partition {partition} with unprocessed events."
+                )
+                continue
+
+            archive_schema = utils_lib_settings.EVENT_PARTITION_ARCHIVE_SCHEMA
+            await drop_event_partition(session, str(table), partition, archive_schema)
+            metrics.EVENT_PARTITIONS_EXPIRED_TOTAL.labels(
+                table=table, action="archived" if archive_schema else "dropped"
+            ).inc()
+            logger.info(f"Expired partition {partition} of {table}.")
+
+    # The ids of the received events are only checked for as long as the inbox keeps them
+    try:
+        await delete_expired_inbox_ids(
+            session,
+            datetime.combine(
+                today - timedelta(days=utils_lib_settings.EVENT_INBOX_RETENTION_DAYS),
+                datetime.min.time(),
+            ),
+        )
+    except Exception as e:
+        await session.rollback()
+        logger.error(f"Error deleting expired inbox ids: {str(e)}")
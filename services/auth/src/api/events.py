@@ -2,12 +2,13 @@ from faststream.nats.fastapi import NatsRouter
 from sqlmodel import delete, not_
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from libs.auth_lib.core.cache import revoke_user_tokens
 from libs.users_lib.api.events import (
     UPDATE_PASSWORD_ROUTE,
     UPDATE_ROLE_ROUTE,
     UPDATE_USERNAME_ROUTE,
 )
-from libs.users_lib.crud import get_user, update_user_role, update_user_username
+from libs.users_lib.crud import update_user, update_user_role, update_user_username
 from libs.users_lib.models import Users
 from libs.users_lib.schemas import (
     UpdateUserPasswordEvent,
@@ -20,7 +21,7 @@ from libs.utils_lib.api.events import (
     logger,
 )
 from libs.utils_lib.core.config import settings as utils_lib_settings
-from libs.utils_lib.models import EventInbox, EventOutbox
+from libs.utils_lib.models import EventInbox, EventInboxId, EventOutbox
 from src.core.config import settings
 from src.models import RefreshTokens
 
@@ -47,6 +48,8 @@ async def cleanup_database_event(session: async_session_dep) -> None:
         await session.execute(statement)
         statement = delete(EventInbox)
         await session.execute(statement)
+        statement = delete(EventInboxId)
+        await session.execute(statement)
         await session.commit()
     else:
         logger.error("Cannot clean up database in this environment.")
@@ -126,15 +129,12 @@ async def update_password_event(
         Returns:
             None
         """
-        user = await get_user(session, data.user_id)
+        user = await update_user(session, data.user_id, {"password": data.new_password})
 
         if not user:
             raise ValueError(f"User {data.user_id} not found.")
 
-        user.password = data.new_password
-        session.add(user)
-        await session.commit()
-        await session.refresh(user)
+        await revoke_user_tokens(data.user_id)
 
     await handle_subscriber_event(
         session=session,
@@ -176,6 +176,7 @@ async def update_role_event(
             None
         """
         await update_user_role(session, data.user_id, data.new_role)
+        await revoke_user_tokens(data.user_id)
 
     await handle_subscriber_event(
         session=session,
@@ -6,7 +6,9 @@ from fastapi import APIRouter, Depends, HTTPException, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
 
 from libs.auth_lib.api.events import CREATE_USER_ROUTE, FORGOT_PASSWORD_SEND_ROUTE
+from libs.auth_lib.core.cache import revoke_user_tokens
 from libs.auth_lib.core.security import (
+    get_password_hash,
     is_email_valid,
     is_password_complex,
     is_username_valid,
@@ -23,12 +25,7 @@ from libs.auth_lib.utils import (
     verify_password_reset_token,
 )
 from libs.users_lib.api.events import PASSWORD_UPDATED_ROUTE, UPDATE_PASSWORD_ROUTE
-from libs.users_lib.crud import (
-    get_user,
-    get_user_by_email,
-    get_user_by_username,
-    update_user_password,
-)
+from libs.users_lib.crud import get_user, update_user_password
 from libs.users_lib.schemas import (
     UpdateUserPasswordEvent,
     UserPasswordUpdatedEvent,
@@ -37,8 +34,13 @@ from libs.users_lib.schemas import (
 from libs.utils_lib.api.deps import async_session_dep, client_ip_dep
 from libs.utils_lib.api.events import handle_publish_event
 from libs.utils_lib.core.config import settings as utils_lib_settings
-from libs.utils_lib.core.limiter import Limiter
-from libs.utils_lib.crud import create_outbox_event
+from libs.utils_lib.core.limiter import (
+    ConcurrencyLimiter,
+    Limiter,
+    shared_budget,
+)
+from libs.utils_lib.crud import create_outbox_event, create_outbox_events
+from libs.utils_lib.models import EventOutbox
 from libs.utils_lib.schemas import Message
 from src.api.config import api_settings
 from src.api.deps import consumed_refresh_token, get_valid_user
@@ -58,7 +60,11 @@ router = APIRouter()
 @router.post(
     "/register",
     response_model=UserPublic,
-    dependencies=[Depends(Limiter("5/minute,25/hour,50/day"))],
+    dependencies=[
+        Depends(Limiter("5/minute,25/hour,50/day", algorithm="gcra")),
+        Depends(shared_budget(cost=10)),
+        Depends(ConcurrencyLimiter(2, bucket="argon2")),
+    ],
 )
 async def register(session: async_session_dep, user: UserCreate) -> Any:
     """
@@ -89,56 +95,43 @@ async def register(session: async_session_dep, user: UserCreate) -> Any:
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=password_complexity
         )
 
-    # Check if username and email are unique
-    if await get_user_by_username(session, username=user.username):
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT, detail="Username is already taken"
-        )
-    if await get_user_by_email(session, email=user.email):
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT, detail="Email is already taken"
-        )
-
     # Convert username and email to lowercase
     user.username = user.username.lower()
     user.email = user.email.lower()
 
-    # Create the user
-    new_user = await create_user(session, user_create=user, commit=False)
+    # Hash the password before the INSERT checks out a database connection
+    password_hash = await get_password_hash(user.password)
 
-    # Create event for user creation
-    event_users_create_user_id = uuid4()
-    event_users_create_user_schema = CreateUserEvent(
-        event_id=event_users_create_user_id, user=new_user
+    # Create the user, the unique indexes reject taken usernames and emails
+    new_user = await create_user(
+        session, user_create=user, commit=False, password_hash=password_hash
     )
 
-    event_users_create_user = await create_outbox_event(
-        session=session,
-        event_id=event_users_create_user_id,
-        event_type=CREATE_USER_ROUTE.subject_for("users"),
-        data=event_users_create_user_schema.model_dump(mode="json"),
-        commit=False,
-    )
+    # Create event for user creation
+    event_users_create_user_schema = CreateUserEvent(event_id=uuid4(), user=new_user)
 
     # Create create user email event
-    event_emails_create_user_id = uuid4()
-    event_emails_create_user_schema = CreateUserEvent(
-        event_id=event_emails_create_user_id, user=new_user
-    )
+    event_emails_create_user_schema = CreateUserEvent(event_id=uuid4(), user=new_user)
 
-    event_emails_create_user = await create_outbox_event(
+    event_users_create_user, event_emails_create_user = await create_outbox_events(
         session=session,
-        event_id=event_emails_create_user_id,
-        event_type=CREATE_USER_ROUTE.subject_for("emails"),
-        data=event_emails_create_user_schema.model_dump(mode="json"),
+        events=[
+            EventOutbox(
+                id=event_users_create_user_schema.event_id,
+                event_type=CREATE_USER_ROUTE.subject_for("users"),
+                data=event_users_create_user_schema.model_dump(mode="json"),
+            ),
+            EventOutbox(
+                id=event_emails_create_user_schema.event_id,
+                event_type=CREATE_USER_ROUTE.subject_for("emails"),
+                data=event_emails_create_user_schema.model_dump(mode="json"),
+            ),
+        ],
         commit=False,
     )
 
-    # Commit and refresh the user
+    # Commit the user and the events
     await session.commit()
-    await session.refresh(new_user)
-    await session.refresh(event_users_create_user)
-    await session.refresh(event_emails_create_user)
 
     # Publish the events
     await handle_publish_event(
@@ -159,7 +152,11 @@ async def register(session: async_session_dep, user: UserCreate) -> Any:
 @router.post(
     "/login",
     response_model=Token,
-    dependencies=[Depends(Limiter("10/minute,50/hour,200/day"))],
+    dependencies=[
+        Depends(Limiter("10/minute,50/hour,200/day", algorithm="gcra")),
+        Depends(shared_budget(cost=10)),
+        Depends(ConcurrencyLimiter(2, bucket="argon2")),
+    ],
 )
 async def login(
     response: Response,
@@ -260,7 +257,10 @@ async def login(
 @router.post(
     "/logout",
     response_model=Message,
-    dependencies=[Depends(Limiter("20/minute,100/hour"))],
+    dependencies=[
+        Depends(Limiter("20/minute,100/hour")),
+        Depends(shared_budget(cost=1)),
+    ],
 )
 async def logout(
     session: async_session_dep, consumed_refresh_token: consumed_refresh_token
@@ -287,7 +287,10 @@ async def logout(
 @router.post(
     "/token/refresh",
     response_model=Token,
-    dependencies=[Depends(Limiter("10/minute,60/hour"))],
+    dependencies=[
+        Depends(Limiter("10/minute,60/hour")),
+        Depends(shared_budget(cost=1)),
+    ],
 )
 async def refresh_access_token(
     response: Response,
@@ -362,7 +365,10 @@ async def refresh_access_token(
 @router.post(
     "/password/forgot",
     response_model=Message,
-    dependencies=[Depends(Limiter("5/minute,15/hour,25/day"))],
+    dependencies=[
+        Depends(Limiter("5/minute,15/hour,25/day")),
+        Depends(shared_budget(cost=1)),
+    ],
 )
 async def send_forgot_password(
     session: async_session_dep, username_email: str
@@ -418,7 +424,11 @@ async def send_forgot_password(
 @router.post(
     "/password/reset",
     response_model=Message,
-    dependencies=[Depends(Limiter("5/minute,15/hour,25/day"))],
+    dependencies=[
+        Depends(Limiter("5/minute,15/hour,25/day")),
+        Depends(shared_budget(cost=10)),
+        Depends(ConcurrencyLimiter(2, bucket="argon2")),
+    ],
 )
 async def reset_password(session: async_session_dep, body: ResetPassword) -> Message:
     """
@@ -492,9 +502,8 @@ async def reset_password(session: async_session_dep, body: ResetPassword) -> Mes
     await invalidate_password_reset_token(token_id)
 
     await session.commit()
-    await session.refresh(user)
-    await session.refresh(event_users_update_password)
-    await session.refresh(event_emails_password_updated)
+
+    await revoke_user_tokens(user.id)
 
     # Publish events
     await handle_publish_event(
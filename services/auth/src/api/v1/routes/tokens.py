@@ -4,7 +4,7 @@ from fastapi import APIRouter, Depends, HTTPException
 
 from libs.auth_lib.api.deps import gen_auth_token_dep
 from libs.utils_lib.api.deps import async_read_session_dep, async_session_dep
-from libs.utils_lib.core.limiter import Limiter
+from libs.utils_lib.core.limiter import Limiter, shared_budget
 from libs.utils_lib.schemas import Message
 from src.api.config import api_settings
 from src.crud import (
@@ -22,7 +22,10 @@ router = APIRouter()
 @router.get(
     "/me",
     response_model=RefreshTokensPublic,
-    dependencies=[Depends(Limiter("30/minute,300/hour"))],
+    dependencies=[
+        Depends(Limiter("30/minute,300/hour")),
+        Depends(shared_budget(cost=1)),
+    ],
 )
 async def get_user_refresh_tokens(
     session: async_read_session_dep, user_token: gen_auth_token_dep
@@ -46,7 +49,8 @@ async def get_user_refresh_tokens(
     "/me/{token_id}",
     response_model=Message,
     dependencies=[
-        Depends(Limiter(f"{api_settings.MAX_REFRESH_TOKENS}/minute,50/hour"))
+        Depends(Limiter(f"{api_settings.MAX_REFRESH_TOKENS}/minute,50/hour")),
+        Depends(shared_budget(cost=1)),
     ],
 )
 async def revoke_user_refresh_token(
@@ -3,6 +3,7 @@ from fastapi.params import Depends
 
 from libs.utils_lib.core.limiter import Limiter
 
+# Used by probes and monitoring, these routes do not charge the shared budget
 router = APIRouter()
 
 
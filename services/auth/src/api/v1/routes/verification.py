@@ -17,7 +17,7 @@ from libs.auth_lib.utils import (
 from libs.users_lib.crud import get_user, get_user_by_email
 from libs.utils_lib.api.deps import async_read_session_dep, async_session_dep
 from libs.utils_lib.api.events import handle_publish_event
-from libs.utils_lib.core.limiter import Limiter
+from libs.utils_lib.core.limiter import Limiter, shared_budget
 from libs.utils_lib.crud import create_outbox_event
 from libs.utils_lib.schemas import Message
 
@@ -27,7 +27,10 @@ router = APIRouter()
 @router.get(
     "/email",
     response_model=Message,
-    dependencies=[Depends(Limiter("5/minute,15/hour,25/day"))],
+    dependencies=[
+        Depends(Limiter("5/minute,15/hour,25/day")),
+        Depends(shared_budget(cost=1)),
+    ],
 )
 async def send_verification_email(
     request: Request, session: async_read_session_dep, email: str
@@ -85,7 +88,7 @@ async def send_verification_email(
 @router.get(
     "/email/{token}",
     response_model=Message,
-    dependencies=[Depends(Limiter("20/minute"))],
+    dependencies=[Depends(Limiter("20/minute")), Depends(shared_budget(cost=1))],
 )
 async def verify_email(
     request: Request, session: async_session_dep, token: str
@@ -119,9 +122,7 @@ async def verify_email(
         )
 
     # Verify email
-    verified_user = await verify_user_email(
-        session=session, user_id=user_id, commit=False
-    )
+    await verify_user_email(session=session, user_id=user_id, commit=False)
 
     # Create verify user event
     event_users_verify_user_id = uuid4()
@@ -151,11 +152,8 @@ async def verify_email(
         commit=False,
     )
 
-    # Commit and refresh the user
+    # Commit the verification and the events
     await session.commit()
-    await session.refresh(verified_user)
-    await session.refresh(event_users_verify_user)
-    await session.refresh(event_emails_verify_user)
 
     # Publish the events
     await handle_publish_event(
@@ -1,3 +1,4 @@
+import time
 from datetime import datetime
 from uuid import UUID, uuid4
 
@@ -34,6 +35,8 @@ def gen_token(data: TokenData, expire: datetime) -> tuple[str, UUID]:
     to_encode = data.model_dump(mode="json")
 
     to_encode["exp"] = expire
+    # Sub-second issue time, so tokens issued right after a revocation stay valid
+    to_encode["iat"] = time.time()
     to_encode["jti"] = str(jti)
 
     encoded_JWT = jwt.encode(
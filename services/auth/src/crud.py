@@ -1,16 +1,45 @@
 from datetime import datetime
 from uuid import UUID
 
+from fastapi import HTTPException, status
+from sqlalchemy import bindparam, insert
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from libs.auth_lib.core.security import get_password_hash, verify_password
 from libs.users_lib.crud import get_user_by_email, get_user_by_username
 from libs.users_lib.models import UserRole, Users
+from libs.utils_lib.core.database import flag_user_write
 from src.api.config import api_settings
 from src.models import RefreshTokens
 from src.schemas import RefreshTokenCreate, UserCreate
 
+# Statements of the hot lookups are built once, so their SQL compilation is cached by the
+# engine and the same prepared statement is reused by asyncpg
+AUTHENTICATE_REFRESH_TOKEN_STATEMENT = select(RefreshTokens).where(
+    RefreshTokens.user_id == bindparam("user_id"),
+    RefreshTokens.jti == bindparam("jti"),
+)
+GET_REFRESH_TOKEN_STATEMENT = select(RefreshTokens).where(
+    RefreshTokens.user_id == bindparam("user_id"),
+    RefreshTokens.id == bindparam("token_id"),
+)
+GET_REFRESH_TOKENS_STATEMENT = select(RefreshTokens).where(
+    RefreshTokens.user_id == bindparam("user_id")
+)
+GET_EXPIRED_TOKENS_STATEMENT = select(RefreshTokens).where(
+    RefreshTokens.user_id == bindparam("user_id"),
+    RefreshTokens.expires_at < bindparam("now"),
+)
+
+
+# Messages of the unique constraints violated by a new user
+USER_UNIQUE_CONSTRAINTS = {
+    "ix_users_username": "Username is already taken",
+    "ix_users_email": "Email is already taken",
+}
+
 
 # CRUD operations for Users
 async def create_root_user(
@@ -55,30 +84,53 @@ async def create_root_user(
 
 
 async def create_user(
-    session: AsyncSession, user_create: UserCreate, commit: bool = True
+    session: AsyncSession,
+    user_create: UserCreate,
+    commit: bool = True,
+    password_hash: str | None = None,
 ) -> Users:
     """
-    Create a new user.
+    Create a new user with a single INSERT ... RETURNING statement.
+
+    The uniqueness of the username and email is enforced by their unique indexes, a
+    violation is raised as a 409 error.
 
     Args:
         session (AsyncSession): The database session.
         user_create (UserCreate): The user create request body.
         commit (bool): Commit at the end of the operation.
+        password_hash (str, optional): The password hash, if already computed.
 
     Returns:
         Users: The created user.
     """
     dbObj = Users.model_validate(
-        user_create, update={"password": await get_password_hash(user_create.password)}
+        user_create,
+        update={
+            "password": password_hash or await get_password_hash(user_create.password)
+        },
     )
 
-    session.add(dbObj)
+    stmt = insert(Users).values(**dbObj.model_dump()).returning(Users)
+    try:
+        result = await session.execute(stmt)
+    except IntegrityError as error:
+        # asyncpg reports the violated constraint on the cause of the DBAPI exception
+        cause = getattr(error.orig, "__cause__", None)
+        constraint = getattr(cause, "constraint_name", None)
+        if constraint not in USER_UNIQUE_CONSTRAINTS:
+            raise
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=USER_UNIQUE_CONSTRAINTS[constraint],
+        ) from error
+    user: Users = result.scalars().one()
+    flag_user_write(session, user.id)
 
     if commit:
         await session.commit()
-        await session.refresh(dbObj)
 
-    return dbObj
+    return user
 
 
 async def authenticate_user(
@@ -149,9 +201,7 @@ async def authenticate_refresh_token(
         RefreshTokens: The authenticated refresh token or None.
     """
     session_token = await session.exec(
-        select(RefreshTokens).where(
-            RefreshTokens.user_id == user_id, RefreshTokens.jti == jti
-        )
+        AUTHENTICATE_REFRESH_TOKEN_STATEMENT, params={"user_id": user_id, "jti": jti}
     )
     return session_token.one_or_none()
 
@@ -169,9 +219,7 @@ async def delete_refresh_token(
         commit (bool): Commit at the end of the operation.
     """
     session_token = await session.exec(
-        select(RefreshTokens).where(
-            RefreshTokens.user_id == user_id, RefreshTokens.id == token_id
-        )
+        GET_REFRESH_TOKEN_STATEMENT, params={"user_id": user_id, "token_id": token_id}
     )
     token_to_delete = session_token.one_or_none()
 
@@ -197,9 +245,7 @@ async def get_refresh_token(
         RefreshTokens: The refresh token or None.
     """
     result = await session.exec(
-        select(RefreshTokens).where(
-            RefreshTokens.user_id == user_id, RefreshTokens.id == token_id
-        )
+        GET_REFRESH_TOKEN_STATEMENT, params={"user_id": user_id, "token_id": token_id}
     )
     return result.one_or_none()
 
@@ -218,7 +264,7 @@ async def get_refresh_tokens(
         list[RefreshTokens]: The list of refresh tokens.
     """
     result = await session.exec(
-        select(RefreshTokens).where(RefreshTokens.user_id == user_id)
+        GET_REFRESH_TOKENS_STATEMENT, params={"user_id": user_id}
     )
     return list(result.all())
 
@@ -235,10 +281,8 @@ async def delete_expired_tokens(
         commit (bool): Commit at the end of the operation.
     """
     result = await session.exec(
-        select(RefreshTokens).where(
-            RefreshTokens.user_id == user_id,
-            RefreshTokens.expires_at < datetime.utcnow(),
-        )
+        GET_EXPIRED_TOKENS_STATEMENT,
+        params={"user_id": user_id, "now": datetime.utcnow()},
     )
 
     expired_tokens = result.all()
@@ -12,6 +12,7 @@ from libs.utils_lib.core.redis import redis_client
 from libs.utils_lib.core.taskiq import result_backend, schedule_source
 from libs.utils_lib.tasks import (
     handle_run_task,
+    maintain_event_partitions,
     rerun_persistent_jobs,
     resend_outbox_events,
 )
@@ -33,6 +34,11 @@ class TasksSettings(BaseSettings):
                 "cron": "* * * * *",
                 "persistent": False,
             },
+            "maintain_event_partitions": {
+                "function": maintain_event_partitions_task,
+                "cron": "0 * * * *",
+                "persistent": False,
+            },
             # This job will only execute once after 20 minutes
             # "one-time-task": {
             #     "function": test,
@@ -107,3 +113,21 @@ async def resend_outbox_events_task(job_name: str | None = None) -> None:
             resend_outbox_events,
             session,
         )
+
+
+@broker.task
+async def maintain_event_partitions_task(job_name: str | None = None) -> None:
+    """
+    Task to create and expire the event outbox and inbox partitions.
+
+    Args:
+        job_name (str | None): The name of the job. If provided, the job will be updated.
+    """
+    async with session_manager.get_session() as session:
+        await handle_run_task(
+            session,
+            "maintain_event_partitions_task",
+            job_name,
+            maintain_event_partitions,
+            session,
+        )
@@ -431,6 +431,39 @@ async def test_reset_password(db: AsyncSession, client: AsyncClient) -> None:
     assert response_reset.status_code == 200
 
 
+@pytest.mark.anyio
+async def test_reset_password_revokes_access_token(
+    db: AsyncSession, client: AsyncClient
+) -> None:
+    username = random_lower_string()
+    email = random_email()
+    user_data = UserCreate(username=username, email=email, password=test_password)
+    user = await create_user(session=db, user_create=user_data)
+
+    user.verified = True
+    await db.commit()
+
+    login_response = await client.post(
+        "/login",
+        data={"username": username, "password": test_password},
+    )
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+
+    # The verified token is cached by the first request
+    response_before = await client.get("/tokens/me", headers=headers)
+    token = await gen_password_reset_token(user_id=user.id)
+    body = {
+        "token": token,
+        "new_password": "NewPassword@1",
+    }
+    response_reset = await client.post("/password/reset", json=body)
+    response_after = await client.get("/tokens/me", headers=headers)
+
+    assert response_before.status_code == 200
+    assert response_reset.status_code == 200
+    assert response_after.status_code == 401
+
+
 @pytest.mark.anyio
 async def test_reset_password_same_password(
     db: AsyncSession, client: AsyncClient
@@ -1,4 +1,5 @@
 import pytest
+from fastapi import HTTPException
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from libs.auth_lib.core.security import verify_password
@@ -30,6 +31,33 @@ async def test_create_user(db: AsyncSession) -> None:
     assert new_user.id
 
 
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "field, detail",
+    [
+        ("username", "Username is already taken"),
+        ("email", "Email is already taken"),
+    ],
+)
+async def test_create_user_exists(db: AsyncSession, field: str, detail: str) -> None:
+    existing = UserCreate(
+        username=random_lower_string(), email=random_email(), password=test_password
+    )
+    await create_user(session=db, user_create=existing)
+
+    duplicate = UserCreate(
+        username=random_lower_string(), email=random_email(), password=test_password
+    )
+    setattr(duplicate, field, getattr(existing, field))
+    with pytest.raises(HTTPException) as exc_info:
+        await create_user(session=db, user_create=duplicate)
+    # The failed INSERT aborted the transaction
+    await db.rollback()
+
+    assert exc_info.value.status_code == 409
+    assert exc_info.value.detail == detail
+
+
 @pytest.mark.anyio
 async def test_authenticate_user(db: AsyncSession) -> None:
     username = random_lower_string()
@@ -0,0 +1,246 @@
+import pytest
+from fakeredis import FakeAsyncRedis, FakeServer
+from fastapi import HTTPException
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from starlette.requests import Request
+from starlette.routing import Route
+
+from libs.utils_lib.core.limiter import (
+    CircuitBreaker,
+    Limiter,
+    LimiterAlgorithm,
+    LimiterStorage,
+)
+from libs.utils_lib.core.redis import RedisClient
+from libs.utils_lib.core.security import security_settings
+
+
+class FakeRedisClient(RedisClient):
+    """A Redis client backed by an in-memory fakeredis server, which can be taken down."""
+
+    def __init__(self) -> None:
+        super().__init__("redis://fakeredis")
+        self.fake = FakeAsyncRedis(server=FakeServer(), decode_responses=True)
+        self.available = True
+
+    def get_client(self) -> Redis:
+        if not self.available:
+            raise RedisError("Redis is unavailable")
+        return self.fake
+
+
+@pytest.fixture
+def fake_redis(monkeypatch: pytest.MonkeyPatch) -> FakeRedisClient:
+    redis_client = FakeRedisClient()
+    monkeypatch.setattr(Limiter, "redis_client", redis_client, raising=False)
+    monkeypatch.setattr(Limiter, "enable_limiter", True)
+    monkeypatch.setattr(Limiter, "scripts", {})
+    monkeypatch.setattr(
+        Limiter,
+        "breaker",
+        CircuitBreaker("test", failure_threshold=2, reset_timeout=30),
+    )
+    monkeypatch.setattr(security_settings, "RATE_LIMIT_LOCAL_ERROR_BOUND", 0.0)
+    return redis_client
+
+
+def make_request(path: str = "/limited", ip: str = "10.0.0.1") -> Request:
+    async def endpoint(_: Request) -> None:
+        return None
+
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": path,
+            "headers": [],
+            "client": (ip, 1234),
+            "route": Route(path, endpoint),
+            "state": {},
+        }
+    )
+
+
+async def check(limiter: Limiter, request: Request) -> int | None:
+    """Run a limiter check, returning the Retry-After of a rejection or None."""
+    try:
+        await limiter.check(request)
+    except HTTPException as e:
+        assert e.status_code == 429
+        assert e.headers
+        return int(e.headers["Retry-After"])
+    return None
+
+
+ALGORITHM_STORAGES = [
+    ("fixed_window", "keys"),
+    ("fixed_window", "hash"),
+    ("sliding_window_log", "keys"),
+    ("sliding_window_counter", "keys"),
+    ("sliding_window_counter", "hash"),
+    ("gcra", "keys"),
+    ("gcra", "hash"),
+]
+
+# Retry-After bounds of a 2/minute rule right after it tripped
+RETRY_AFTER = {
+    "fixed_window": (59, 60),
+    "sliding_window_log": (59, 60),
+    # Depends on how far into the current bucket the requests are
+    "sliding_window_counter": (1, 120),
+    # One emission interval of 60 / 2 seconds
+    "gcra": (30, 30),
+}
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("algorithm, storage", ALGORITHM_STORAGES)
+async def test_limiter_allows_then_rejects(
+    monkeypatch: pytest.MonkeyPatch,
+    fake_redis: FakeRedisClient,
+    algorithm: LimiterAlgorithm,
+    storage: LimiterStorage,
+) -> None:
+    _ = fake_redis  # Serves the limiter scripts
+    monkeypatch.setattr(security_settings, "RATE_LIMIT_STORAGE", storage)
+    limiter = Limiter("2/minute", algorithm=algorithm)
+    assert limiter.storage == storage
+
+    results = [await check(limiter, make_request()) for _ in range(3)]
+
+    assert results[:2] == [None, None]
+    assert results[2] is not None
+    low, high = RETRY_AFTER[algorithm]
+    assert low <= results[2] <= high
+
+    # Other clients and routes have budgets of their own
+    assert await check(limiter, make_request(ip="10.0.0.2")) is None
+    assert await check(limiter, make_request(path="/other")) is None
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("algorithm, storage", ALGORITHM_STORAGES)
+async def test_limiter_rejects_without_redis_while_blocked(
+    monkeypatch: pytest.MonkeyPatch,
+    fake_redis: FakeRedisClient,
+    algorithm: LimiterAlgorithm,
+    storage: LimiterStorage,
+) -> None:
+    monkeypatch.setattr(security_settings, "RATE_LIMIT_STORAGE", storage)
+    limiter = Limiter("1/minute", algorithm=algorithm)
+
+    assert await check(limiter, make_request()) is None
+    assert await check(limiter, make_request()) is not None
+
+    # The identity is rejected locally until its retry time, without asking Redis
+    fake_redis.available = False
+    assert await check(limiter, make_request()) is not None
+    assert limiter.breaker.state == "closed"
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("algorithm, storage", ALGORITHM_STORAGES)
+async def test_limiter_records_local_hits_when_rejected(
+    monkeypatch: pytest.MonkeyPatch,
+    fake_redis: FakeRedisClient,
+    algorithm: LimiterAlgorithm,
+    storage: LimiterStorage,
+) -> None:
+    _ = fake_redis  # Serves the limiter scripts
+    monkeypatch.setattr(security_settings, "RATE_LIMIT_STORAGE", storage)
+    monkeypatch.setattr(security_settings, "RATE_LIMIT_LOCAL_ERROR_BOUND", 0.7)
+    limiter = Limiter("3/minute", algorithm=algorithm)
+    assert limiter.local_budget == 2
+
+    # One hit checked in Redis, two admitted locally, then the sync is rejected
+    results = [await check(limiter, make_request()) for _ in range(4)]
+    assert results[:3] == [None, None, None]
+    assert results[3] is not None
+
+    # Another pod sees the three hits that were let through
+    other_pod = Limiter("3/minute", algorithm=algorithm)
+    assert await check(other_pod, make_request()) is not None
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("storage", ["keys", "hash"])
+async def test_fixed_window_charges_only_allowed_hits(
+    monkeypatch: pytest.MonkeyPatch,
+    fake_redis: FakeRedisClient,
+    storage: LimiterStorage,
+) -> None:
+    monkeypatch.setattr(security_settings, "RATE_LIMIT_STORAGE", storage)
+    limiter = Limiter("2/minute,100/hour", algorithm="fixed_window")
+    script = limiter.get_script("fixed_window", storage)
+
+    async def run(admitted: int) -> tuple[int, list[int]]:
+        """Run the script, returning the tripped window and the count of every window."""
+        keys, args = limiter.get_script_call("10.0.0.1", "GET:/limited", 1, admitted)
+        tripped, _ = await script(keys=keys, args=args, client=fake_redis.fake)
+        if storage == "hash":
+            values = await fake_redis.fake.hmget(keys[0], args[-2:])
+        else:
+            values = [await fake_redis.fake.get(key) for key in keys]
+        return int(tripped), [int(value.split(":")[0]) for value in values]
+
+    assert await run(0) == (0, [1, 1])
+    assert await run(0) == (0, [2, 2])
+    # A denied request is not charged
+    assert await run(0) == (1, [2, 2])
+    # Locally admitted hits are recorded in every window, even past the tripped one
+    assert await run(5) == (1, [7, 7])
+
+
+@pytest.mark.anyio
+async def test_limiter_cost(fake_redis: FakeRedisClient) -> None:
+    _ = fake_redis  # Serves the limiter scripts
+    limiter = Limiter("10/minute", cost=4)
+
+    results = [await check(limiter, make_request()) for _ in range(3)]
+
+    assert results[:2] == [None, None]
+    assert results[2] is not None
+
+
+@pytest.mark.anyio
+async def test_circuit_breaker_opens_and_closes(
+    monkeypatch: pytest.MonkeyPatch, fake_redis: FakeRedisClient
+) -> None:
+    limiter = Limiter("2/minute")
+    breaker = limiter.breaker
+
+    # Failed Redis calls fall back to the in-memory windows until the circuit opens
+    fake_redis.available = False
+    assert await check(limiter, make_request()) is None
+    assert breaker.state == "closed"
+    assert await check(limiter, make_request()) is None
+    assert breaker.state == "open"
+
+    # The open circuit keeps enforcing the rules per pod without calling Redis
+    assert await check(limiter, make_request()) is not None
+    assert breaker.failures == 2
+
+    # Once the reset timeout has passed a probe is let through, its success closes the circuit
+    fake_redis.available = True
+    monkeypatch.setattr(breaker, "reset_timeout", 0)
+    assert await check(limiter, make_request(ip="10.0.0.2")) is None
+    assert breaker.state == "closed"
+    assert breaker.failures == 0
+
+
+@pytest.mark.anyio
+async def test_circuit_breaker_reopens_on_failed_probe(
+    monkeypatch: pytest.MonkeyPatch, fake_redis: FakeRedisClient
+) -> None:
+    limiter = Limiter("5/minute")
+    breaker = limiter.breaker
+
+    fake_redis.available = False
+    for _ in range(2):
+        await check(limiter, make_request())
+    assert breaker.state == "open"
+
+    monkeypatch.setattr(breaker, "reset_timeout", 0)
+    assert await check(limiter, make_request()) is None
+    assert breaker.state == "open"
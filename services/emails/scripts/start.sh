@@ -0,0 +1,23 @@
+#! /usr/bin/env bash
+set -e
+
+WORKERS="${WORKERS:-1}"
+
+# Aggregate the Prometheus metrics of multiple workers through a shared directory
+if [ "$WORKERS" -gt 1 ]; then
+    export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus}"
+fi
+
+# Drop the metric files of previous runs
+if [ -n "$PROMETHEUS_MULTIPROC_DIR" ]; then
+    rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+    mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+fi
+
+# A single worker is served by uvicorn directly, without a master process
+if [ "$WORKERS" -eq 1 ]; then
+    exec fastapi run src/main.py
+fi
+
+# Preload the app in the master process and fork the workers from it
+exec python -m libs.utils_lib.server src.main:app --workers "$WORKERS"
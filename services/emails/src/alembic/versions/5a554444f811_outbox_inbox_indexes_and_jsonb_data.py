@@ -0,0 +1,86 @@
+"""outbox inbox indexes and jsonb data
+
+Revision ID: 5a554444f811
+Revises: 5f0d11c60d0f
+Create Date: 2026-10-17 09:12:37.552190
+
+"""
+from typing import Sequence, Union
+from uuid import UUID
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '5a554444f811'
+down_revision: Union[str, None] = '5f0d11c60d0f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Rows of data copied to JSONB per statement
+BATCH_SIZE = 10000
+
+
+def upgrade() -> None:
+    # data is converted by copying it to a JSONB column in batches and swapping the columns,
+    # converting it in place rewrites the table under an ACCESS EXCLUSIVE lock. Until the
+    # swap, a trigger converts the data of the events written meanwhile
+    for table in ('eventinbox', 'eventoutbox'):
+        op.add_column(table, sa.Column('data_jsonb', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+        op.execute(f"""
+            CREATE FUNCTION {table}_data_jsonb() RETURNS trigger AS $$
+            BEGIN
+                NEW.data_jsonb := NEW.data::jsonb;
+                RETURN NEW;
+            END $$ LANGUAGE plpgsql
+        """)
+        op.execute(
+            f'CREATE TRIGGER {table}_data_jsonb BEFORE INSERT OR UPDATE OF data ON {table} '
+            f'FOR EACH ROW EXECUTE FUNCTION {table}_data_jsonb()'
+        )
+
+    with op.get_context().autocommit_block():
+        for table in ('eventinbox', 'eventoutbox'):
+            last_id = UUID(int=0)
+            while True:
+                result = op.get_bind().execute(
+                    sa.text(
+                        f'WITH batch AS (SELECT id FROM {table} WHERE id > :last_id ORDER BY id LIMIT :batch_size) '
+                        f'UPDATE {table} SET data_jsonb = data::jsonb FROM batch WHERE {table}.id = batch.id '
+                        f'RETURNING {table}.id'
+                    ),
+                    {'last_id': last_id, 'batch_size': BATCH_SIZE},
+                )
+                ids = result.scalars().all()
+                if not ids:
+                    break
+                last_id = max(ids)
+
+            # Only the events still to process are indexed, so the resend queries stay
+            # proportional to the pending and failed events
+            op.create_index(f'ix_{table}_status_created_at', table, ['status', 'created_at'], unique=False,
+                       postgresql_where=sa.text("status IN ('pending', 'failed')"),
+                       postgresql_concurrently=True)
+
+    for table in ('eventinbox', 'eventoutbox'):
+        op.execute(f'DROP TRIGGER {table}_data_jsonb ON {table}')
+        op.execute(f'DROP FUNCTION {table}_data_jsonb()')
+        op.drop_column(table, 'data')
+        op.alter_column(table, 'data_jsonb', new_column_name='data')
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table in ('eventoutbox', 'eventinbox'):
+            op.drop_index(f'ix_{table}_status_created_at', table_name=table,
+                       postgresql_where=sa.text("status IN ('pending', 'failed')"),
+                       postgresql_concurrently=True)
+
+    for table in ('eventoutbox', 'eventinbox'):
+        op.alter_column(table, 'data',
+                   existing_type=postgresql.JSONB(astext_type=sa.Text()),
+                   type_=sa.JSON(),
+                   existing_nullable=True,
+                   postgresql_using='data::json')
@@ -24,7 +24,7 @@ from libs.utils_lib.api.events import (
     logger,
 )
 from libs.utils_lib.core.config import settings as utils_lib_settings
-from libs.utils_lib.models import EventInbox, EventOutbox
+from libs.utils_lib.models import EventInbox, EventInboxId, EventOutbox
 from src.core.config import settings
 from src.crud import (
     get_user,
@@ -56,6 +56,8 @@ async def cleanup_database_event(session: async_session_dep) -> None:
         await session.execute(statement)
         statement = delete(EventInbox)
         await session.execute(statement)
+        statement = delete(EventInboxId)
+        await session.execute(statement)
         await session.commit()
     else:
         logger.error("Cannot clean up database in this environment.")
@@ -1,6 +1,8 @@
+from typing import Any
 from uuid import UUID
 
 from fastapi import HTTPException, status
+from sqlalchemy import update
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
@@ -59,6 +61,38 @@ async def get_user_by_email(session: AsyncSession, email: str) -> UserEmails | N
     return result.one_or_none()
 
 
+async def update_user(
+    session: AsyncSession, user_id: UUID, values: dict[str, Any], commit: bool = True
+) -> UserEmails | None:
+    """
+    Update user fields with a single UPDATE ... RETURNING statement.
+
+    Args:
+        session (AsyncSession): The database session.
+        user_id (UUID): The user ID.
+        values (dict[str, Any]): The fields to update.
+        commit (bool): Commit at the end of the operation.
+
+    Returns:
+        Users: The updated user or None.
+    """
+    # populate_existing refreshes the user already loaded in the session with the row
+    stmt = (
+        update(UserEmails)
+        .where(UserEmails.id == user_id)  # type: ignore[arg-type]
+        .values(**values)
+        .returning(UserEmails)
+        .execution_options(populate_existing=True)
+    )
+    result = await session.execute(stmt)
+    user: UserEmails | None = result.scalars().one_or_none()
+
+    if commit:
+        await session.commit()
+
+    return user
+
+
 async def update_user_username(
     session: AsyncSession, user_id: UUID, new_username: str, commit: bool = True
 ) -> UserEmails:
@@ -74,20 +108,13 @@ async def update_user_username(
     Returns:
         Users: The updated user.
     """
-    user = await get_user(session, user_id)
+    user = await update_user(session, user_id, {"username": new_username}, commit)
 
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
 
-    user.username = new_username
-    session.add(user)
-
-    if commit:
-        await session.commit()
-        await session.refresh(user)
-
     return user
 
 
@@ -104,18 +131,11 @@ async def verify_user_email(
     Returns:
         Users: The verified user.
     """
-    user = await get_user(session, user_id)
+    user = await update_user(session, user_id, {"verified": True}, commit)
 
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
 
-    user.verified = True
-    session.add(user)
-
-    if commit:
-        await session.commit()
-        await session.refresh(user)
-
     return user
@@ -4,9 +4,9 @@ from uuid import UUID, uuid4
 from sqlmodel import Field, SQLModel
 
 from libs.auth_lib.core.security import security_settings as auth_lib_security_settings
-from libs.utils_lib.models import EventInbox, EventOutbox, Jobs
+from libs.utils_lib.models import EventInbox, EventInboxId, EventOutbox, Jobs
 
-__all__ = ["SQLModel", "EventInbox", "EventOutbox", "Jobs"]
+__all__ = ["SQLModel", "EventInbox", "EventInboxId", "EventOutbox", "Jobs"]
 
 
 # Base models
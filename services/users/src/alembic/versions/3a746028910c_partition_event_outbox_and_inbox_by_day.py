@@ -0,0 +1,115 @@
+"""partition event outbox and inbox by day
+
+Revision ID: 3a746028910c
+Revises: 8a28c6bf1efc
+Create Date: 2026-10-17 14:41:09.664302
+
+"""
+from datetime import datetime, timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '3a746028910c'
+down_revision: Union[str, None] = '8a28c6bf1efc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Daily partitions created ahead by the migration, maintain_event_partitions keeps it up
+PREMAKE_DAYS = 3
+
+
+def create_event_table(table: str, partitioned: bool) -> None:
+    op.create_table(table,
+    sa.Column('event_type', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
+    sa.Column('status', postgresql.ENUM('pending', 'processed', 'failed', name='eventstatus', create_type=False), nullable=False),
+    sa.Column('retries', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('processed_at', sa.DateTime(), nullable=True),
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('data', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('error_message', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('id', 'created_at') if partitioned else sa.PrimaryKeyConstraint('id'),
+    postgresql_partition_by='RANGE (created_at)' if partitioned else None,
+    )
+    op.create_index(f'ix_{table}_status_created_at', table, ['status', 'created_at'], unique=False,
+               postgresql_where=sa.text("status IN ('pending', 'failed')"))
+
+
+def upgrade() -> None:
+    # The existing table becomes the partition of all events up to tomorrow, it is dropped
+    # by maintain_event_partitions once its events are past the retention
+    upper_bound = datetime.utcnow().date() + timedelta(days=1)
+
+    # The new primary key index and the partition bound are built and checked without
+    # blocking writes, so the table swap below only takes brief locks
+    with op.get_context().autocommit_block():
+        for table in ('eventinbox', 'eventoutbox'):
+            op.create_index(f'{table}_legacy_pkey', table, ['id', 'created_at'], unique=True,
+                            postgresql_concurrently=True, if_not_exists=True)
+            op.execute(f'ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {table}_legacy_bound')
+            op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_legacy_bound CHECK (created_at < '{upper_bound}') NOT VALID")
+            op.execute(f'ALTER TABLE {table} VALIDATE CONSTRAINT {table}_legacy_bound')
+
+    # The primary key of the partitioned inbox includes created_at, the received ids are
+    # kept unique in their own table
+    op.create_table('eventinboxid',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_eventinboxid_created_at'), 'eventinboxid', ['created_at'], unique=False)
+    op.execute('INSERT INTO eventinboxid (id, created_at) SELECT id, created_at FROM eventinbox')
+
+    for table in ('eventinbox', 'eventoutbox'):
+        op.execute(f'ALTER TABLE {table} RENAME TO {table}_legacy')
+        op.execute(
+            f'ALTER TABLE {table}_legacy DROP CONSTRAINT {table}_pkey, '
+            f'ADD CONSTRAINT {table}_legacy_pkey PRIMARY KEY USING INDEX {table}_legacy_pkey'
+        )
+        op.execute(f'ALTER INDEX ix_{table}_status_created_at RENAME TO ix_{table}_legacy_status_created_at')
+
+        create_event_table(table, partitioned=True)
+        # The validated bound lets the attach skip the scan of the existing events
+        op.execute(
+            f"ALTER TABLE {table} ATTACH PARTITION {table}_legacy "
+            f"FOR VALUES FROM (MINVALUE) TO ('{upper_bound}')"
+        )
+        op.execute(f'ALTER TABLE {table}_legacy DROP CONSTRAINT {table}_legacy_bound')
+        op.execute(f"""
+            DO $$
+            DECLARE
+                partition_day date;
+            BEGIN
+                FOR offset_days IN 1..{PREMAKE_DAYS} LOOP
+                    partition_day := '{upper_bound}'::date + offset_days - 1;
+                    EXECUTE format(
+                        'CREATE TABLE %I PARTITION OF {table} FOR VALUES FROM (%L) TO (%L)',
+                        '{table}_p' || to_char(partition_day, 'YYYYMMDD'), partition_day, partition_day + 1
+                    );
+                END LOOP;
+            END $$;
+        """)
+        # Events of days without a partition are kept here rather than rejected
+        op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+
+
+def downgrade() -> None:
+    for table in ('eventoutbox', 'eventinbox'):
+        op.execute(f'ALTER TABLE {table} RENAME TO {table}_partitioned')
+        op.execute(f'ALTER TABLE {table}_partitioned RENAME CONSTRAINT {table}_pkey TO {table}_partitioned_pkey')
+        op.execute(f'ALTER INDEX ix_{table}_status_created_at RENAME TO ix_{table}_partitioned_status_created_at')
+
+        create_event_table(table, partitioned=False)
+        op.execute(
+            f'INSERT INTO {table} (event_type, status, retries, created_at, processed_at, id, data, error_message) '
+            f'SELECT event_type, status, retries, created_at, processed_at, id, data, error_message FROM {table}_partitioned'
+        )
+        op.drop_table(f'{table}_partitioned')
+
+    op.drop_index(op.f('ix_eventinboxid_created_at'), table_name='eventinboxid')
+    op.drop_table('eventinboxid')
@@ -7,10 +7,11 @@ from libs.auth_lib.api.events import (
     CREATE_USER_ROUTE,
     VERIFY_USER_ROUTE,
 )
+from libs.auth_lib.core.cache import revoke_user_tokens
 from libs.auth_lib.crud import verify_user_email
 from libs.auth_lib.schemas import CreateUserEvent, VerifyUserEvent
 from libs.users_lib.api.events import UPDATE_PASSWORD_ROUTE
-from libs.users_lib.crud import get_user, get_user_by_username
+from libs.users_lib.crud import get_user_by_username, update_user
 from libs.users_lib.models import Users
 from libs.users_lib.schemas import UpdateUserPasswordEvent
 from libs.utils_lib.api.deps import async_session_dep
@@ -19,7 +20,7 @@ from libs.utils_lib.api.events import (
     logger,
 )
 from libs.utils_lib.core.config import settings as utils_lib_settings
-from libs.utils_lib.models import EventInbox, EventOutbox
+from libs.utils_lib.models import EventInbox, EventInboxId, EventOutbox
 from src.core.config import settings
 
 nats_router = NatsRouter()
@@ -43,6 +44,8 @@ async def cleanup_database_event(session: async_session_dep) -> None:
         await session.execute(statement)
         statement = delete(EventInbox)
         await session.execute(statement)
+        statement = delete(EventInboxId)
+        await session.execute(statement)
         await session.commit()
     else:
         logger.error("Cannot clean up database in this environment.")
@@ -144,15 +147,12 @@ async def update_password_event(
         Returns:
             None
         """
-        user = await get_user(session, data.user_id)
+        user = await update_user(session, data.user_id, {"password": data.new_password})
 
         if not user:
             raise ValueError(f"User {data.user_id} not found.")
 
-        user.password = data.new_password
-        session.add(user)
-        await session.commit()
-        await session.refresh(user)
+        await revoke_user_tokens(data.user_id)
 
     await handle_subscriber_event(
         session=session,
@@ -3,6 +3,7 @@ from uuid import UUID, uuid4
 from fastapi import APIRouter, Depends, HTTPException
 
 from libs.auth_lib.api.deps import mgmt_auth_token_dep
+from libs.auth_lib.core.cache import revoke_user_tokens
 from libs.users_lib.api.events import UPDATE_ROLE_ROUTE
 from libs.users_lib.crud import (
     get_user_by_email,
@@ -13,7 +14,7 @@ from libs.users_lib.models import UserRole, Users
 from libs.users_lib.schemas import UpdateUserRoleEvent, UserPublic
 from libs.utils_lib.api.deps import async_read_session_dep, async_session_dep
 from libs.utils_lib.api.events import handle_publish_event
-from libs.utils_lib.core.limiter import Limiter
+from libs.utils_lib.core.limiter import Limiter, shared_budget
 from libs.utils_lib.crud import create_outbox_event
 from libs.utils_lib.schemas import Message
 from src.schemas import UpdateUserRole
@@ -24,7 +25,10 @@ router = APIRouter()
 @router.get(
     "/users",
     response_model=UserPublic,
-    dependencies=[Depends(Limiter("30/minute,300/hour"))],
+    dependencies=[
+        Depends(Limiter("30/minute,300/hour")),
+        Depends(shared_budget(cost=1)),
+    ],
 )
 async def get_user_data(
     session: async_read_session_dep,
@@ -57,7 +61,10 @@ async def get_user_data(
 
 @router.get(
     "/roles",
-    dependencies=[Depends(Limiter("60/minute,1000/hour"))],
+    dependencies=[
+        Depends(Limiter("60/minute,1000/hour")),
+        Depends(shared_budget(cost=1)),
+    ],
 )
 async def get_roles(user_token: mgmt_auth_token_dep) -> list[str]:
     """
@@ -77,7 +84,10 @@ async def get_roles(user_token: mgmt_auth_token_dep) -> list[str]:
 
 @router.patch(
     "/users/{user_id}/role",
-    dependencies=[Depends(Limiter("15/minute,100/hour,300/day"))],
+    dependencies=[
+        Depends(Limiter("15/minute,100/hour,300/day")),
+        Depends(shared_budget(cost=1)),
+    ],
     response_model=Message,
 )
 async def update_role(
@@ -124,7 +134,8 @@ async def update_role(
     )
 
     await session.commit()
-    await session.refresh(user)
+
+    await revoke_user_tokens(user.id)
 
     await handle_publish_event(
         session=session,
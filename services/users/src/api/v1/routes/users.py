@@ -3,6 +3,7 @@ from uuid import uuid4
 from fastapi import APIRouter, Depends, HTTPException, status
 
 from libs.auth_lib.api.deps import gen_auth_token_dep
+from libs.auth_lib.core.cache import revoke_user_tokens
 from libs.auth_lib.core.security import (
     is_password_complex,
     is_username_valid,
@@ -26,9 +27,13 @@ from libs.users_lib.schemas import (
     UserPasswordUpdatedEvent,
     UserPublic,
 )
-from libs.utils_lib.api.deps import async_read_session_dep, async_session_dep
+from libs.utils_lib.api.deps import async_hedged_read_session_dep, async_session_dep
 from libs.utils_lib.api.events import handle_publish_event
-from libs.utils_lib.core.limiter import Limiter
+from libs.utils_lib.core.limiter import (
+    ConcurrencyLimiter,
+    Limiter,
+    shared_budget,
+)
 from libs.utils_lib.crud import create_outbox_event
 from libs.utils_lib.schemas import Message
 from src.schemas import (
@@ -42,10 +47,13 @@ router = APIRouter()
 @router.get(
     "/me",
     response_model=UserPublic,
-    dependencies=[Depends(Limiter("30/minute,300/hour"))],
+    dependencies=[
+        Depends(Limiter("30/minute,300/hour")),
+        Depends(shared_budget(cost=1)),
+    ],
 )
 async def my_details(
-    session: async_read_session_dep, user_token: gen_auth_token_dep
+    session: async_hedged_read_session_dep, user_token: gen_auth_token_dep
 ) -> Users:
     """
     Get the current user details.
@@ -70,7 +78,10 @@ async def my_details(
 @router.patch(
     "/me/username",
     response_model=Message,
-    dependencies=[Depends(Limiter("5/minute,15/hour,30/day"))],
+    dependencies=[
+        Depends(Limiter("5/minute,15/hour,30/day")),
+        Depends(shared_budget(cost=1)),
+    ],
 )
 async def update_username(
     session: async_session_dep, body: UpdateUsername, user_token: gen_auth_token_dep
@@ -157,9 +168,6 @@ async def update_username(
     )
 
     await session.commit()
-    await session.refresh(user)
-    await session.refresh(event_auth_update_username)
-    await session.refresh(event_emails_update_username)
 
     # Publish events
     await handle_publish_event(
@@ -179,7 +187,11 @@ async def update_username(
 @router.patch(
     "/me/password",
     response_model=Message,
-    dependencies=[Depends(Limiter("5/minute,15/hour,30/day"))],
+    dependencies=[
+        Depends(Limiter("5/minute,15/hour,30/day")),
+        Depends(shared_budget(cost=20)),
+        Depends(ConcurrencyLimiter(2, bucket="argon2")),
+    ],
 )
 async def update_password(
     session: async_session_dep, body: UpdatePassword, user_token: gen_auth_token_dep
@@ -259,9 +271,8 @@ async def update_password(
     )
 
     await session.commit()
-    await session.refresh(user)
-    await session.refresh(event_auth_update_password)
-    await session.refresh(event_emails_password_updated)
+
+    await revoke_user_tokens(user.id)
 
     # Publish events
     await handle_publish_event(
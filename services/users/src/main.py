@@ -3,7 +3,6 @@ from typing import Any
 
 import anyio
 from fastapi import FastAPI
-from prometheus_client import start_http_server
 from pydantic_settings import BaseSettings
 from starlette.middleware.cors import CORSMiddleware
 
@@ -11,8 +10,8 @@ from libs.utils_lib.api import events as utils_lib_events
 from libs.utils_lib.core.config import settings as utils_lib_settings
 from libs.utils_lib.core.database import session_manager
 from libs.utils_lib.core.faststream import nats
-from libs.utils_lib.core.limiter import Limiter
-from libs.utils_lib.core.prometheus import PrometheusMiddleware
+from libs.utils_lib.core.limiter import Limiter, LimiterMiddleware
+from libs.utils_lib.core.prometheus import MetricsExporter, PrometheusMiddleware
 from libs.utils_lib.core.redis import redis_client
 from libs.utils_lib.core.security import (
     security_settings as utils_lib_security_settings,
@@ -46,15 +45,14 @@ app_settings = AppSettings()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> Any:
-    _ = app  # Unused variable
-    # Generate OpenAPI documentation
-    generate_openapi(app)
     # Set thread pool size
     thread_pool_limiter = anyio.to_thread.current_default_thread_limiter()
     thread_pool_limiter.total_tokens = app_settings.THREAD_POOL_SIZE
-    # Start Prometheus metrics server on port 9000 (separate from FastAPI app)
-    prometheus_server, prometheus_thread = start_http_server(9000)
-    # Initialize database, Redis, NATS, and Rate Limiter connections on startup
+    # Start Prometheus metrics server on port 9000 (separate from FastAPI app),
+    # with multiple workers only the primary worker serves the aggregated metrics
+    metrics_exporter = MetricsExporter(port=9000)
+    is_primary = metrics_exporter.start()
+    # Initialize database, Redis, NATS, and Rate Limiter connections of this worker
     await session_manager.init_db()
     await redis_client.connect()
     await nats.start()
@@ -62,12 +60,15 @@ async def lifespan(app: FastAPI) -> Any:
         redis_client=redis_client,
         enable_limiter=utils_lib_security_settings.ENABLE_RATE_LIMIT,
     )
-    # Schedule jobs
-    await schedule_jobs(jobs=tasks_settings.JOBS)
+    # Run the startup tasks needed once per pod on the primary worker
+    if is_primary:
+        # Generate OpenAPI documentation
+        generate_openapi(app)
+        # Schedule jobs
+        await schedule_jobs(jobs=tasks_settings.JOBS)
     yield
     # Shutdown Prometheus metrics server
-    prometheus_server.shutdown()
-    prometheus_thread.join()
+    metrics_exporter.stop()
     # Close database, Redis, and NATS connections on shutdown
     await session_manager.close()
     await redis_client.close()
@@ -86,6 +87,13 @@ app = FastAPI(
     root_path=app_settings.ROOT_PATH,
 )
 
+# Add rate limiter middleware (inside Prometheus so rejections are measured)
+app.add_middleware(
+    LimiterMiddleware,
+    global_rules=utils_lib_security_settings.RATE_LIMIT_GLOBAL_RULES,
+    service_rules=utils_lib_security_settings.RATE_LIMIT_SERVICE_RULES,
+)
+
 # Add Prometheus middleware
 app.add_middleware(
     PrometheusMiddleware,
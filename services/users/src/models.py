@@ -1,6 +1,6 @@
 from sqlmodel import SQLModel
 
 from libs.users_lib.models import Users
-from libs.utils_lib.models import EventInbox, EventOutbox, Jobs
+from libs.utils_lib.models import EventInbox, EventInboxId, EventOutbox, Jobs
 
-__all__ = ["SQLModel", "Users", "EventInbox", "EventOutbox", "Jobs"]
+__all__ = ["SQLModel", "Users", "EventInbox", "EventInboxId", "EventOutbox", "Jobs"]
@@ -133,6 +133,29 @@ async def test_update_password(
     assert await verify_password(new_password, user.password)
 
 
+@pytest.mark.anyio
+async def test_update_password_revokes_access_token(
+    db: AsyncSession, client: AsyncClient, auth_client: AsyncClient
+) -> None:
+    headers, _ = await create_and_login_user_helper(db, auth_client)
+
+    update_data = {
+        "current_password": test_password,
+        "new_password": "NewPassword@1",
+    }
+    response_before = await client.get("/users/me", headers=headers)
+    update_response = await client.patch(
+        "/users/me/password",
+        headers=headers,
+        json=update_data,
+    )
+    response_after = await client.get("/users/me", headers=headers)
+
+    assert response_before.status_code == 200
+    assert update_response.status_code == 200
+    assert response_after.status_code == 401
+
+
 @pytest.mark.anyio
 async def test_update_password_incorrect_password(
     db: AsyncSession, client: AsyncClient, auth_client: AsyncClient
@@ -0,0 +1,117 @@
+import random
+from datetime import date, datetime, timedelta
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import text, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from libs.utils_lib.core.config import settings as utils_lib_settings
+from libs.utils_lib.crud import (
+    create_event_partition,
+    create_inbox_event,
+    delete_expired_inbox_ids,
+    drop_event_partition,
+    get_event_partitions,
+    has_unprocessed_events,
+)
+from libs.utils_lib.models import EventInboxId, EventOutbox, EventStatus
+from libs.utils_lib.tasks import maintain_event_partitions
+
+
+def random_future_day() -> date:
+    # Far enough ahead for the default partition to hold no events of the day
+    return date(2100, 1, 1) + timedelta(days=random.randint(0, 100000))
+
+
+@pytest.mark.anyio
+async def test_create_and_drop_event_partition(db: AsyncSession) -> None:
+    day = random_future_day()
+    partition = f"eventoutbox_p{day:%Y%m%d}"
+
+    await create_event_partition(db, "eventoutbox", day)
+    # Creating an existing partition is a no-op
+    await create_event_partition(db, "eventoutbox", day)
+
+    partitions = dict(await get_event_partitions(db, "eventoutbox"))
+    assert partitions[partition] == datetime.combine(
+        day + timedelta(days=1), datetime.min.time()
+    )
+    assert partitions["eventoutbox_default"] is None
+
+    event = EventOutbox(
+        id=uuid4(),
+        event_type="test",
+        created_at=datetime.combine(day, datetime.min.time()),
+    )
+    db.add(event)
+    await db.commit()
+    assert await has_unprocessed_events(db, partition)
+
+    event.status = EventStatus.processed
+    await db.commit()
+    assert not await has_unprocessed_events(db, partition)
+
+    await drop_event_partition(db, "eventoutbox", partition)
+
+    assert partition not in dict(await get_event_partitions(db, "eventoutbox"))
+
+
+@pytest.mark.anyio
+async def test_archive_event_partition(db: AsyncSession) -> None:
+    day = random_future_day()
+    partition = f"eventinbox_p{day:%Y%m%d}"
+
+    await create_event_partition(db, "eventinbox", day)
+    await drop_event_partition(db, "eventinbox", partition, archive_schema="archive")
+
+    assert partition not in dict(await get_event_partitions(db, "eventinbox"))
+    result = await db.execute(
+        text("SELECT to_regclass(:name) IS NOT NULL"),
+        params={"name": f"archive.{partition}"},
+    )
+    assert result.scalar_one()
+
+    await db.execute(text(f'DROP TABLE "archive"."{partition}"'))
+    await db.commit()
+
+
+@pytest.mark.anyio
+async def test_maintain_event_partitions(db: AsyncSession) -> None:
+    await maintain_event_partitions(db)
+
+    today = datetime.utcnow().date()
+    for table in ("eventoutbox", "eventinbox"):
+        partitions = dict(await get_event_partitions(db, table))
+        for offset in range(1, utils_lib_settings.EVENT_PARTITION_PREMAKE_DAYS + 1):
+            assert f"{table}_p{today + timedelta(days=offset):%Y%m%d}" in partitions
+
+
+@pytest.mark.anyio
+async def test_create_inbox_event_duplicate(db: AsyncSession) -> None:
+    event_id = uuid4()
+    await create_inbox_event(db, event_id, "test", {})
+
+    # The ids are unique across partitions, whatever the creation time of the copy
+    with pytest.raises(IntegrityError):
+        await create_inbox_event(db, event_id, "test", {})
+    await db.rollback()
+
+
+@pytest.mark.anyio
+async def test_delete_expired_inbox_ids(db: AsyncSession) -> None:
+    expired_id, recent_id = uuid4(), uuid4()
+    await create_inbox_event(db, expired_id, "test", {})
+    await create_inbox_event(db, recent_id, "test", {})
+    await db.execute(
+        update(EventInboxId)
+        .where(EventInboxId.id == expired_id)  # type: ignore[arg-type]
+        .values(created_at=datetime(2000, 1, 1))
+    )
+    await db.commit()
+
+    await delete_expired_inbox_ids(db, datetime(2000, 1, 2))
+
+    assert await db.get(EventInboxId, expired_id) is None
+    assert await db.get(EventInboxId, recent_id) is not None
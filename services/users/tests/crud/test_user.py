@@ -1,4 +1,7 @@
+from uuid import uuid4
+
 import pytest
+from fastapi import HTTPException
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from tests.utils.utils import create_random_user_helper
@@ -8,6 +11,7 @@ from libs.users_lib.crud import (
     get_user,
     get_user_by_email,
     get_user_by_username,
+    update_user,
     update_user_password,
     update_user_role,
     update_user_username,
@@ -88,3 +92,54 @@ async def test_update_user_role(db: AsyncSession) -> None:
 
     assert updated_user
     assert updated_user.role == new_role
+
+
+@pytest.mark.anyio
+async def test_update_user(db: AsyncSession) -> None:
+    new_user = await create_random_user_helper(db)
+
+    updated_user = await update_user(
+        session=db, user_id=new_user.id, values={"disabled": True}
+    )
+
+    assert updated_user
+    assert updated_user.disabled
+    # The user loaded in the session is refreshed with the updated row
+    assert new_user.disabled
+
+
+@pytest.mark.anyio
+async def test_update_user_not_found(db: AsyncSession) -> None:
+    updated_user = await update_user(
+        session=db, user_id=uuid4(), values={"disabled": True}
+    )
+
+    assert updated_user is None
+
+
+@pytest.mark.anyio
+async def test_update_user_username_not_found(db: AsyncSession) -> None:
+    with pytest.raises(HTTPException) as exc_info:
+        await update_user_username(
+            session=db, user_id=uuid4(), new_username=random_lower_string()
+        )
+
+    assert exc_info.value.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_update_user_password_not_found(db: AsyncSession) -> None:
+    with pytest.raises(HTTPException) as exc_info:
+        await update_user_password(
+            session=db, user_id=uuid4(), new_password="NewPassword@2"
+        )
+
+    assert exc_info.value.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_update_user_role_not_found(db: AsyncSession) -> None:
+    with pytest.raises(HTTPException) as exc_info:
+        await update_user_role(session=db, user_id=uuid4(), role=UserRole.admin)
+
+    assert exc_info.value.status_code == 404
@@ -0,0 +1,143 @@
+import asyncio
+from collections.abc import AsyncGenerator
+
+import pytest
+from sqlalchemy import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from tests.utils.utils import create_random_user_helper
+
+from libs.users_lib.crud import update_user
+from libs.users_lib.models import Users
+from libs.utils_lib.core.database import (
+    DatabaseSessionManager,
+    HedgedReadSession,
+    ReadReplica,
+    session_manager,
+)
+
+
+@pytest.fixture
+async def manager() -> AsyncGenerator[DatabaseSessionManager, None]:
+    """
+    A session manager with two replicas: the primary database standing in for a healthy
+    replica, and a replica nothing listens on.
+    """
+    manager = DatabaseSessionManager(database_url=session_manager.database_url)
+    await manager.init_db()
+    url = make_url(session_manager.database_url)
+    manager.replicas = [
+        ReadReplica("reachable", create_async_engine(url)),
+        ReadReplica("unreachable", create_async_engine(url.set(port=1))),
+    ]
+    yield manager
+    await manager.close()
+
+
+@pytest.mark.anyio
+async def test_probe_ejects_unreachable_replica(
+    manager: DatabaseSessionManager,
+) -> None:
+    reachable, unreachable = manager.replicas
+
+    await asyncio.gather(*(replica.probe() for replica in manager.replicas))
+
+    assert reachable.healthy
+    assert reachable.lag == 0
+    assert not unreachable.healthy
+    assert unreachable.lag is None
+
+
+@pytest.mark.anyio
+async def test_get_replica_balances_healthy_replicas(
+    manager: DatabaseSessionManager,
+) -> None:
+    reachable, unreachable = manager.replicas
+
+    # The replica with the fewest outstanding sessions is used
+    async with reachable.get_session():
+        assert reachable.outstanding == 1
+        assert manager.get_replica() is unreachable
+    assert reachable.outstanding == 0
+
+    # Ejected and excluded replicas are skipped
+    unreachable.healthy = False
+    assert manager.get_replica() is reachable
+    assert manager.get_replica(exclude=reachable) is None
+
+
+@pytest.mark.anyio
+async def test_get_session_falls_back_to_primary(
+    manager: DatabaseSessionManager,
+) -> None:
+    for replica in manager.replicas:
+        replica.healthy = False
+
+    async with manager.get_session(read_only=True) as session:
+        assert session.bind is manager.engine
+
+
+@pytest.mark.anyio
+async def test_has_replayed_outside_recovery(manager: DatabaseSessionManager) -> None:
+    reachable, _ = manager.replicas
+
+    # A database which is not replaying WAL has all the writes it knows of
+    async with reachable.get_session() as session:
+        assert await manager.has_replayed(session, "FFFFFFFF/FFFFFFFF")
+
+
+@pytest.mark.anyio
+async def test_committed_user_writes(db: AsyncSession) -> None:
+    new_user = await create_random_user_helper(db)
+
+    async with session_manager.get_session() as session:
+        await update_user(session, new_user.id, {"disabled": True}, commit=False)
+        await session.rollback()
+        assert not session.info.get("committed_user_writes")
+
+        await update_user(session, new_user.id, {"disabled": True})
+        assert session.info["committed_writes"]
+        assert session.info["committed_user_writes"] == {str(new_user.id)}
+
+
+@pytest.mark.anyio
+async def test_hedged_read(
+    monkeypatch: pytest.MonkeyPatch, db: AsyncSession, manager: DatabaseSessionManager
+) -> None:
+    new_user = await create_random_user_helper(db)
+    reachable, unreachable = manager.replicas
+    unreachable.healthy = False
+    # Every query is hedged right away to the primary
+    monkeypatch.setattr(HedgedReadSession, "hedge_delay", 0.0)
+
+    async with manager.get_hedged_session(reachable) as session:
+        statement = select(Users).where(Users.id == new_user.id)
+        user = (await session.exec(statement)).one()
+        assert user.id == new_user.id
+        # The winning result is merged into the caller's session, which holds no connection
+        assert user in session
+        assert reachable.engine.pool.checkedout() == 1  # type: ignore[attr-defined]
+
+        # The session keeps working once the losing query has been cancelled
+        user = (await session.exec(statement)).one()
+        assert user.username == new_user.username
+
+
+@pytest.mark.anyio
+async def test_hedged_read_failed_replica(
+    monkeypatch: pytest.MonkeyPatch, db: AsyncSession, manager: DatabaseSessionManager
+) -> None:
+    new_user = await create_random_user_helper(db)
+    reachable, unreachable = manager.replicas
+    reachable.healthy = False
+    monkeypatch.setattr(HedgedReadSession, "hedge_delay", 0.0)
+
+    # The replica query fails, the hedge to the primary answers it
+    async with manager.get_hedged_session(unreachable) as session:
+        statement = select(Users).where(Users.id == new_user.id)
+        user = (await session.exec(statement)).one()
+        assert user.id == new_user.id
+        assert isinstance(session, HedgedReadSession)
+        assert session.use_backup